@@ -0,0 +1,90 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("is_active", sa.Boolean()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "roles",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.String()),
+    )
+    op.create_index("ix_roles_id", "roles", ["id"])
+    op.create_index("ix_roles_name", "roles", ["name"], unique=True)
+
+    op.create_table(
+        "permissions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String()),
+        sa.Column("description", sa.String()),
+        sa.Column("resource", sa.String()),
+        sa.Column("action", sa.String()),
+    )
+    op.create_index("ix_permissions_id", "permissions", ["id"])
+    op.create_index("ix_permissions_name", "permissions", ["name"], unique=True)
+
+    op.create_table(
+        "user_role",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("role_id", sa.Integer(), sa.ForeignKey("roles.id")),
+    )
+
+    op.create_table(
+        "role_permission",
+        sa.Column("role_id", sa.Integer(), sa.ForeignKey("roles.id")),
+        sa.Column("permission_id", sa.Integer(), sa.ForeignKey("permissions.id")),
+    )
+
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("timestamp", sa.DateTime()),
+        sa.Column("action", sa.String()),
+        sa.Column("resource", sa.String()),
+        sa.Column("resource_id", sa.String(), nullable=True),
+        sa.Column("access_granted", sa.Boolean()),
+        sa.Column("ip_address", sa.String(), nullable=True),
+        sa.Column("request_method", sa.String()),
+        sa.Column("request_path", sa.String()),
+        sa.Column("request_body", sa.JSON(), nullable=True),
+        sa.Column("response_status", sa.Integer()),
+        sa.Column("additional_details", sa.JSON(), nullable=True),
+    )
+    op.create_index("ix_audit_logs_id", "audit_logs", ["id"])
+    op.create_index("ix_audit_logs_timestamp", "audit_logs", ["timestamp"])
+    op.create_index("ix_audit_logs_action", "audit_logs", ["action"])
+    op.create_index("ix_audit_logs_resource", "audit_logs", ["resource"])
+
+
+def downgrade():
+    op.drop_table("audit_logs")
+    op.drop_table("role_permission")
+    op.drop_table("user_role")
+    op.drop_table("permissions")
+    op.drop_table("roles")
+    op.drop_table("users")
@@ -0,0 +1,33 @@
+"""audit sketches
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audit_sketches",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("bucket_start", sa.DateTime()),
+        sa.Column("metric", sa.String()),
+        sa.Column("key", sa.String()),
+        sa.Column("node", sa.String()),
+        sa.Column("sketch", sa.LargeBinary()),
+        sa.UniqueConstraint("bucket_start", "metric", "key", "node"),
+    )
+    op.create_index("ix_audit_sketches_id", "audit_sketches", ["id"])
+    op.create_index("ix_audit_sketches_bucket_start", "audit_sketches", ["bucket_start"])
+
+
+def downgrade():
+    op.drop_table("audit_sketches")
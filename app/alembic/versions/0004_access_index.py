@@ -0,0 +1,25 @@
+"""indexes for reverse permission lookups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_permissions_resource_action", "permissions", ["resource", "action"])
+    op.create_index("ix_role_permission_permission_id_role_id", "role_permission", ["permission_id", "role_id"])
+    op.create_index("ix_user_role_role_id_user_id", "user_role", ["role_id", "user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_user_role_role_id_user_id", table_name="user_role")
+    op.drop_index("ix_role_permission_permission_id_role_id", table_name="role_permission")
+    op.drop_index("ix_permissions_resource_action", table_name="permissions")
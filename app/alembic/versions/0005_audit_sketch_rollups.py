@@ -0,0 +1,32 @@
+"""daily audit sketch rollups
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "audit_sketch_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("day_start", sa.DateTime()),
+        sa.Column("metric", sa.String()),
+        sa.Column("key", sa.String()),
+        sa.Column("sketch", sa.LargeBinary()),
+        sa.UniqueConstraint("day_start", "metric", "key"),
+    )
+    op.create_index("ix_audit_sketch_rollups_id", "audit_sketch_rollups", ["id"])
+    op.create_index("ix_audit_sketch_rollups_day_start", "audit_sketch_rollups", ["day_start"])
+
+
+def downgrade():
+    op.drop_table("audit_sketch_rollups")
@@ -1,4 +1,9 @@
-from sqlalchemy import create_engine
+import itertools
+import time
+from typing import List
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import get_settings
@@ -10,9 +15,106 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Alembic revision this code expects; bump together with every new migration
+SCHEMA_VERSION = "0005"
+
+def check_schema_version(bind=engine):
+    """
+    Compare the database's alembic revision with SCHEMA_VERSION in one query.
+    Migrations are applied separately with `alembic upgrade head`.
+    """
+    try:
+        with bind.connect() as connection:
+            version = connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except SQLAlchemyError:
+        version = None
+
+    if version != SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at revision {version!r}, expected {SCHEMA_VERSION!r}. "
+            "Run `alembic -c app/alembic/alembic.ini upgrade head`."
+        )
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
+    finally:
+        db.close()
+
+class ReplicaRouter:
+    """
+    Hands out sessions on read replicas, round robin, falling back to the
+    primary. A replica that fails a probe or a query is skipped for
+    REPLICA_RETRY_SECONDS. With REPLICA_MAX_STALENESS_SECONDS set, replicas
+    lagging further behind the primary are skipped too. Probes run at most
+    every REPLICA_CHECK_SECONDS per replica, not on every request.
+    """
+
+    def __init__(self, engines: List[Engine]):
+        self.engines = engines
+        self.sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in engines
+        ]
+        self.unhealthy_until = [0.0] * len(engines)
+        self.checked_at = [0.0] * len(engines)
+        self.rotation = itertools.count()
+
+    def _replication_lag(self, replica: Engine) -> float:
+        with replica.connect() as connection:
+            if replica.dialect.name == "postgresql":
+                lag = connection.execute(text(
+                    "SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+                )).scalar()
+                return float(lag or 0)
+            # Other backends (e.g. SQLite files used locally) just get a liveness probe
+            connection.execute(text("SELECT 1"))
+            return 0.0
+
+    def mark_unhealthy(self, index: int):
+        self.unhealthy_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+    def _is_usable(self, index: int) -> bool:
+        now = time.monotonic()
+        if now < self.unhealthy_until[index]:
+            return False
+        if now - self.checked_at[index] < settings.REPLICA_CHECK_SECONDS:
+            return True
+
+        self.checked_at[index] = now
+        try:
+            lag = self._replication_lag(self.engines[index])
+        except SQLAlchemyError:
+            self.mark_unhealthy(index)
+            return False
+        if settings.REPLICA_MAX_STALENESS_SECONDS is not None and lag > settings.REPLICA_MAX_STALENESS_SECONDS:
+            self.mark_unhealthy(index)
+            return False
+        return True
+
+    def session(self):
+        """Return (session, replica index), with index None for the primary."""
+        if self.engines:
+            start = next(self.rotation)
+            for offset in range(len(self.engines)):
+                index = (start + offset) % len(self.engines)
+                if self._is_usable(index):
+                    return self.sessionmakers[index](), index
+        return SessionLocal(), None
+
+replica_engines = [
+    create_engine(url.strip()) for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()
+]
+replica_router = ReplicaRouter(replica_engines)
+
+def get_read_db():
+    """Session for read-only analytic endpoints; writes must use get_db."""
+    db, replica = replica_router.session()
+    try:
+        yield db
+    except OperationalError:
+        if replica is not None:
+            replica_router.mark_unhealthy(replica)
+        raise
     finally:
         db.close()
\ No newline at end of file
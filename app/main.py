@@ -1,23 +1,45 @@
-from fastapi import FastAPI, Depends, HTTPException, status # type: ignore
+from fastapi import FastAPI, Depends, HTTPException, Request, status # type: ignore
 from fastapi.security import OAuth2PasswordRequestForm # type: ignore
 from fastapi.middleware.cors import CORSMiddleware # type: ignore
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from .database import get_db, engine
-from .models import user, role, permission, audit
-from .routers import user, role, permission, audit
-from .utils.auth import verify_password, create_access_token
+import asyncio
+from .database import get_db, engine, replica_engines, check_schema_version
+from .models import user as user_models
+from .routers import user, role, permission, audit, profiling, admission
+from .middleware.audit import AuditMiddleware
+from .middleware.profiling import ProfilingMiddleware
+from .middleware.admission import AdmissionMiddleware
+from .utils.profiler import install_sql_timing
+from .utils.auth import verify_password, create_access_token, get_current_user, decode_token_payload, oauth2_scheme
+from .utils.revocation import revoke_token
+from .utils.access_alerts import record_denied_access
+from .utils.audit_logger import log_access_attempt
+from .utils.audit_analytics import compact_periodically, flush_periodically, flush_sketches
 from .config import get_settings
 
-# Create database tables
-user.Base.metadata.create_all(bind=engine)
-role.Base.metadata.create_all(bind=engine)
-permission.Base.metadata.create_all(bind=engine)
-audit.Base.metadata.create_all(bind=engine)
-
+# Tables are created and upgraded by alembic migrations, not at import time
 settings = get_settings()
 app = FastAPI(title="RBAC System API")
 
+@app.on_event("startup")
+def verify_schema():
+    if settings.SCHEMA_CHECK_ON_STARTUP:
+        check_schema_version()
+
+@app.on_event("startup")
+async def start_sketch_tasks():
+    app.state.sketch_tasks = [
+        asyncio.create_task(flush_periodically()),
+        asyncio.create_task(compact_periodically())
+    ]
+
+@app.on_event("shutdown")
+async def stop_sketch_tasks():
+    for task in app.state.sketch_tasks:
+        task.cancel()
+    await flush_sketches()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -26,20 +48,33 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(AuditMiddleware)
+
+# Profiling hooks are only installed when enabled, so they cost nothing otherwise
+if settings.PROFILING_ENABLED:
+    for bind in [engine, *replica_engines]:
+        install_sql_timing(bind)
+    app.add_middleware(ProfilingMiddleware)
+
+# Outermost, so shed requests are turned away before any other work
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionMiddleware)
 
 # Include routers
 app.include_router(user.router)
 app.include_router(role.router)
 app.include_router(permission.router)
 app.include_router(audit.router)
+app.include_router(profiling.router)
+app.include_router(admission.router)
 
 @app.post("/token")
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = db.query(user.User).filter(user.User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = db.query(user_models.User).filter(user_models.User.username == form_data.username).first()
+    if not user or user.is_active is False or not verify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -54,12 +89,21 @@ async def login_for_access_token(
     
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.post("/logout")
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    revoke_token(db, decode_token_payload(token))
+    return {"message": "Logged out successfully"}
+
 @app.get("/validate-access")
 async def validate_user_access(
+    request: Request,
     resource: str,
     action: str,
     db: Session = Depends(get_db),
-    current_user: user.User = Depends(get_current_user) # type: ignore
+    current_user: user_models.User = Depends(get_current_user)
 ):
     has_access = any(
         permission.resource == resource and permission.action == action
@@ -67,8 +111,11 @@ async def validate_user_access(
         for permission in role.permissions
     )
     
+    if not has_access:
+        record_denied_access(current_user.id, request.client.host if request.client else None)
+
     # Log the access attempt
-    log_access_attempt( # type: ignore
+    log_access_attempt(
         db=db,
         user=current_user,
         action=action,
@@ -0,0 +1,31 @@
+from fastapi import Request, Response # type: ignore
+from fastapi.responses import JSONResponse # type: ignore
+from starlette.middleware.base import BaseHTTPMiddleware # type: ignore
+from typing import Callable
+from ..config import get_settings
+from ..utils.admission import controller
+
+settings = get_settings()
+
+class AdmissionMiddleware(BaseHTTPMiddleware):
+    """
+    Limits concurrent requests per route class (auth > admin > analytics)
+    and answers 503 with Retry-After when a request is shed.
+    """
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        route_class = controller.classify(request.url.path)
+        if route_class is None or request.method == "OPTIONS":
+            return await call_next(request)
+
+        if not await controller.acquire(route_class):
+            return JSONResponse(
+                status_code=503,
+                content={"detail": f"Server busy, {route_class.name} requests are being shed"},
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)}
+            )
+
+        try:
+            return await call_next(request)
+        finally:
+            controller.release(route_class)
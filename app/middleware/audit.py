@@ -1,72 +1,132 @@
 from datetime import datetime
-from fastapi import Request, Response # type: ignore
-from starlette.middleware.base import BaseHTTPMiddleware # type: ignore
-from starlette.types import Message # type: ignore
-from typing import Callable
+from fastapi import Request # type: ignore
+from starlette.types import ASGIApp, Message, Receive, Scope, Send # type: ignore
 import json
 from ..database import SessionLocal
 from ..models.audit import AuditLog
 from ..utils.auth import get_current_user
+from ..utils.audit_stream import broadcaster
+from ..utils.access_alerts import record_denied_access
+from ..utils.audit_analytics import UNMATCHED_ROUTE, aggregator
+
+class AuditMiddleware:
+    """
+    Writes an audit log row for every request once its response has been sent.
+
+    This is a plain ASGI middleware rather than a BaseHTTPMiddleware: the
+    request body is captured as the endpoint reads it, instead of being
+    consumed up front, which would leave the endpoint waiting for a body
+    that never arrives.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-class AuditMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Start timing the request
         start_time = datetime.utcnow()
-        
-        # Get the original request body
-        body = await request.body()
-        request._body = body  # Save the body for later use
-        
-        # Try to get the current user
-        user_id = None
-        try:
-            db = SessionLocal()
-            user = await get_current_user(request, db)
-            user_id = user.id if user else None
-        except:
-            pass
-        finally:
-            if 'db' in locals():
-                db.close()
+        body = bytearray()
+        response_status = 500
 
-        # Process the request and get the response
-        response = await call_next(request)
-        
+        async def receive_and_capture() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                body.extend(message.get("body", b""))
+            return message
+
+        async def send_and_capture(message: Message):
+            nonlocal response_status
+            if message["type"] == "http.response.start":
+                response_status = message["status"]
+            await send(message)
+
+        await self.app(scope, receive_and_capture, send_and_capture)
+
+        request = Request(scope)
         # Only log if the path doesn't start with /docs or /openapi
         if not request.url.path.startswith(('/docs', '/openapi')):
-            # Create audit log entry
-            try:
-                db = SessionLocal()
-                
-                # Try to parse request body
+            await self.log_request(request, bytes(body), response_status, start_time)
+
+    async def log_request(self, request: Request, body: bytes, response_status: int, start_time: datetime):
+        db = SessionLocal()
+        try:
+            # Try to get the current user
+            user_id = None
+            token = request.headers.get("authorization", "").removeprefix("Bearer ")
+            if token:
                 try:
-                    request_body = json.loads(body)
-                except:
-                    request_body = None
-
-                # Create audit log
-                log_entry = AuditLog(
-                    user_id=user_id,
-                    action=request.method,
-                    resource=request.url.path,
-                    access_granted=response.status_code < 400,
-                    ip_address=request.client.host,
-                    request_method=request.method,
-                    request_path=request.url.path,
-                    request_body=request_body if request_body else None,
-                    response_status=response.status_code,
-                    additional_details={
-                        "processing_time": (datetime.utcnow() - start_time).total_seconds(),
-                        "user_agent": request.headers.get("user-agent"),
-                        "query_params": dict(request.query_params)
-                    }
-                )
-                
-                db.add(log_entry)
-                db.commit()
-            except Exception as e:
-                print(f"Error creating audit log: {str(e)}")
-            finally:
-                db.close()
-
-        return response
\ No newline at end of file
+                    user_id = (await get_current_user(token, db)).id
+                except Exception:
+                    user_id = None
+
+            # Try to parse request body
+            try:
+                request_body = json.loads(body)
+            except ValueError:
+                request_body = None
+
+            processing_time = (datetime.utcnow() - start_time).total_seconds()
+            ip_address = request.client.host if request.client else None
+            access_granted = response_status < 400
+
+            # Create audit log
+            log_entry = AuditLog(
+                user_id=user_id,
+                timestamp=start_time,
+                action=request.method,
+                resource=request.url.path,
+                access_granted=access_granted,
+                ip_address=ip_address,
+                request_method=request.method,
+                request_path=request.url.path,
+                request_body=request_body if request_body else None,
+                response_status=response_status,
+                additional_details={
+                    "processing_time": processing_time,
+                    "user_agent": request.headers.get("user-agent"),
+                    "query_params": dict(request.query_params)
+                }
+            )
+
+            if not access_granted:
+                record_denied_access(user_id, ip_address)
+
+            db.add(log_entry)
+            db.flush()
+            log_id = log_entry.id  # Read before commit expires the instance
+            db.commit()
+
+            # Push the event to live /audit/stream subscribers
+            if broadcaster.subscribers:
+                broadcaster.publish({
+                    "id": log_id,
+                    "timestamp": start_time.isoformat(),
+                    "user_id": user_id,
+                    "action": request.method,
+                    "resource": request.url.path,
+                    "access_granted": access_granted,
+                    "ip_address": ip_address,
+                    "request_method": request.method,
+                    "request_path": request.url.path,
+                    "response_status": response_status,
+                    "processing_time": processing_time
+                })
+
+            # Sketches are keyed by route template to keep cardinality bounded;
+            # requests that matched no route (404s, scanners) share one key
+            route = request.scope.get("route")
+            aggregator.record(
+                timestamp=start_time,
+                route=f"{request.method} {route.path if route else UNMATCHED_ROUTE}",
+                user_id=user_id,
+                ip_address=ip_address,
+                processing_time=processing_time
+            )
+        except Exception as e:
+            print(f"Error creating audit log: {str(e)}")
+        finally:
+            db.close()
@@ -0,0 +1,64 @@
+import hmac
+import random
+import threading
+import time
+from fastapi import Request, Response # type: ignore
+from starlette.middleware.base import BaseHTTPMiddleware # type: ignore
+from typing import Callable
+from ..config import get_settings
+from ..utils.profiler import RequestProfile, StackSampler, current_profile, profiles
+
+settings = get_settings()
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Profiles a request when the caller sends `X-Profile: <PROFILING_HEADER_SECRET>`,
+    or when it is picked by PROFILING_SAMPLE_RATE. Only added to the app
+    when PROFILING_ENABLED is set.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        # Requests in flight, profiled or not, to flag loop-wide samples
+        self.in_flight = 0
+
+    def _should_profile(self, request: Request) -> bool:
+        secret = request.headers.get("x-profile")
+        if secret and settings.PROFILING_HEADER_SECRET and \
+                hmac.compare_digest(secret, settings.PROFILING_HEADER_SECRET):
+            return True
+        return random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        self.in_flight += 1
+        try:
+            return await self._dispatch(request, call_next)
+        finally:
+            self.in_flight -= 1
+
+    async def _dispatch(self, request: Request, call_next: Callable) -> Response:
+        if not self._should_profile(request):
+            return await call_next(request)
+
+        profile = RequestProfile(request.method, request.url.path)
+        # Async endpoints run on the event loop thread, so sample that one
+        sampler = StackSampler(
+            profile,
+            threading.get_ident(),
+            settings.PROFILING_INTERVAL_SECONDS,
+            lambda: self.in_flight
+        )
+        token = current_profile.set(profile)
+        start_time = time.perf_counter()
+        sampler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+            current_profile.reset(token)
+            profile.duration_ms = (time.perf_counter() - start_time) * 1000
+            profiles.append(profile)
+
+        profile.response_status = response.status_code
+        response.headers["X-Profile-Id"] = profile.id
+        return response
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, UniqueConstraint
+from ..database import Base
+
+class AuditSketch(Base):
+    __tablename__ = "audit_sketches"
+    __table_args__ = (UniqueConstraint("bucket_start", "metric", "key", "node"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, index=True)  # Start of the time bucket the sketch covers
+    metric = Column(String)  # distinct_users, distinct_ips or latency
+    key = Column(String)  # Route the sketch is for, e.g. "GET /users/{user_id}"
+    node = Column(String)  # Worker process that wrote it, or "*" once compacted across workers
+    sketch = Column(LargeBinary)  # Serialized HyperLogLog or t-digest
+
+class AuditSketchRollup(Base):
+    """One day of compacted sketches, read for whole days of long ranges"""
+    __tablename__ = "audit_sketch_rollups"
+    __table_args__ = (UniqueConstraint("day_start", "metric", "key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day_start = Column(DateTime, index=True)  # Midnight UTC
+    metric = Column(String)
+    key = Column(String)
+    sketch = Column(LargeBinary)
\ No newline at end of file
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 class Permission(Base):
     __tablename__ = "permissions"
+    __table_args__ = (Index("ix_permissions_resource_action", "resource", "action"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from ..database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, nullable=True, index=True)  # Single revoked token (logout)
+    username = Column(String, nullable=True)  # Without jti: every token issued to the user before revoked_at
+    revoked_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, index=True)  # Once passed, the revoked tokens are expired anyway
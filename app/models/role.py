@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -6,7 +6,8 @@ role_permission = Table(
     'role_permission',
     Base.metadata,
     Column('role_id', Integer, ForeignKey('roles.id')),
-    Column('permission_id', Integer, ForeignKey('permissions.id'))
+    Column('permission_id', Integer, ForeignKey('permissions.id')),
+    Index('ix_role_permission_permission_id_role_id', 'permission_id', 'role_id')
 )
 
 class Role(Base):
@@ -1,5 +1,4 @@
-from xmlrpc.client import Boolean
-from sqlalchemy import Column, Integer, String, ForeignKey, Table
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Table, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -7,7 +6,8 @@ user_role = Table(
     'user_role',
     Base.metadata,
     Column('user_id', Integer, ForeignKey('users.id')),
-    Column('role_id', Integer, ForeignKey('roles.id'))
+    Column('role_id', Integer, ForeignKey('roles.id')),
+    Index('ix_user_role_role_id_user_id', 'role_id', 'user_id')
 )
 
 class User(Base):
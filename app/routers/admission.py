@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException # type: ignore
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User
+from ..utils.auth import get_current_user, validate_access
+from ..utils.admission import controller
+
+router = APIRouter(prefix="/admission", tags=["admission"])
+
+@router.get("/status")
+async def get_admission_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Current admission control state: concurrency limits, active and queued
+    requests per route class, and how many were admitted, rejected or timed out
+    """
+    if not validate_access(current_user, "admission", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to view admission control")
+
+    return controller.status()
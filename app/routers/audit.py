@@ -1,19 +1,28 @@
+import asyncio
 import csv
+import json
+import time
 from io import StringIO
+from itertools import islice
 
-from django.http import StreamingHttpResponse
-from numpy import ufunc
 from fastapi import APIRouter, Depends, HTTPException, Query, Request # type: ignore
+from fastapi.responses import StreamingResponse # type: ignore
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func
 from typing import List, Optional
 from datetime import datetime, timedelta
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import audit as audit_models
 from ..schemas import audit as audit_schemas
 from ..utils.auth import get_current_user, validate_access
+from ..utils import audit_archive
+from ..utils.audit_stream import broadcaster
+from ..utils import access_alerts
+from ..utils.audit_analytics import merge_sketches
+from ..config import get_settings
 from ..models.user import User
 
+settings = get_settings()
 router = APIRouter(prefix="/audit", tags=["audit"])
 
 
@@ -34,7 +43,7 @@ async def get_audit_logs(
     response_status: Optional[int] = Query(None),
     page: int = Query(1, gt=0),
     limit: int = Query(50, gt=0, le=100),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -64,8 +73,9 @@ async def get_audit_logs(
 
     # Add pagination
     total = query.count()
+    offset = (page - 1) * limit
     query = query.order_by(audit_models.AuditLog.timestamp.desc())\
-                 .offset((page - 1) * limit)\
+                 .offset(offset)\
                  .limit(limit)
 
     logs = query.all()
@@ -75,6 +85,21 @@ async def get_audit_logs(
         if hasattr(log, 'user') and log.user:
             log.username = log.user.username
 
+    # Archived logs are older than anything still in audit_logs,
+    # so they continue the page once the hot rows run out
+    if len(logs) < limit:
+        archived = audit_archive.query_archived_logs(
+            start_date=start_date,
+            end_date=end_date,
+            user_id=user_id,
+            action=action,
+            resource=resource,
+            access_granted=access_granted,
+            response_status=response_status
+        )
+        archive_offset = max(0, offset - total)
+        logs = logs + list(islice(archived, archive_offset, archive_offset + limit - len(logs)))
+
     return logs
 
 #for example, 
@@ -85,7 +110,7 @@ async def get_audit_logs(
 async def get_audit_logs_summary(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -112,9 +137,9 @@ async def get_audit_logs_summary(
     # Get most accessed resources
     resource_access = db.query(
         audit_models.AuditLog.resource,
-        ufunc.count(audit_models.AuditLog.id).label('count')
+        func.count(audit_models.AuditLog.id).label('count')
     ).group_by(audit_models.AuditLog.resource)\
-     .order_by(ufunc.count(audit_models.AuditLog.id).desc())\
+     .order_by(func.count(audit_models.AuditLog.id).desc())\
      .limit(5)\
      .all()
 
@@ -128,12 +153,83 @@ async def get_audit_logs_summary(
         ]
     }
 
+@router.get("/alerts")
+async def get_access_alerts(
+    window_seconds: Optional[int] = Query(None, gt=0),
+    limit: int = Query(20, gt=0, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get users and IP addresses with the most denied requests in the sliding
+    window, and which of them are over the alert threshold.
+    Counts are kept in memory as requests are audited; no logs are scanned.
+    """
+    if not validate_access(current_user, "audit_logs", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to access audit logs")
+
+    window = min(window_seconds or settings.ACCESS_ALERT_WINDOW_SECONDS, settings.ACCESS_ALERT_WINDOW_SECONDS)
+    now = time.time()
+    users = access_alerts.user_denials.offenders(now, window, limit)
+    ips = access_alerts.ip_denials.offenders(now, window, limit)
+
+    return {
+        "window_seconds": window,
+        "users": users,
+        "ips": ips,
+        "breaches": {
+            "users": [offender["user_id"] for offender in users if offender["breached"]],
+            "ips": [offender["ip_address"] for offender in ips if offender["breached"]]
+        }
+    }
+
+@router.get("/logs/analytics")
+async def get_audit_logs_analytics(
+    start_date: Optional[datetime] = Query(None),
+    end_date: Optional[datetime] = Query(None),
+    route: Optional[str] = Query(None, description='e.g. "GET /users/{user_id}"'),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Approximate analytics per route, merged from per-bucket sketches:
+    - Distinct users and IP addresses (HyperLogLog, ~2% error)
+    - p50/p95/p99 processing time (t-digest)
+    Ranges are rounded out to whole AUDIT_SKETCH_BUCKET_SECONDS buckets;
+    whole days are read from daily rollups once they have been compacted.
+    """
+    if not validate_access(current_user, "audit_logs", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to access audit logs")
+
+    # Decoding and merging sketches is CPU bound; keep it off the event loop
+    sketches = await asyncio.to_thread(merge_sketches, db, start_date, end_date, route)
+    routes = sorted({key for _, key in sketches})
+
+    results = []
+    for key in routes:
+        users = sketches.get(("distinct_users", key))
+        ips = sketches.get(("distinct_ips", key))
+        latency = sketches.get(("latency", key))
+        results.append({
+            "route": key,
+            "requests": latency.count() if latency else 0,
+            "distinct_users": users.count() if users else 0,
+            "distinct_ips": ips.count() if ips else 0,
+            "processing_time": {
+                "p50": latency.quantile(0.50),
+                "p95": latency.quantile(0.95),
+                "p99": latency.quantile(0.99)
+            } if latency else None
+        })
+
+    return {"routes": results}
+
 @router.get("/logs/export")
 async def export_audit_logs(
     start_date: Optional[datetime] = Query(None),
     end_date: Optional[datetime] = Query(None),
     format: str = Query("csv", regex="^(csv|json)$"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -149,6 +245,7 @@ async def export_audit_logs(
         query = query.filter(audit_models.AuditLog.timestamp <= end_date)
 
     logs = query.all()
+    archived = audit_archive.query_archived_logs(start_date=start_date, end_date=end_date)
     
     if format == "csv":
         # Create CSV content
@@ -166,11 +263,75 @@ async def export_audit_logs(
                 log.resource, log.access_granted, log.ip_address,
                 log.request_method, log.response_status
             ])
+
+        for record in archived:
+            writer.writerow([
+                record["id"], record["timestamp"], record["user_id"], record["action"],
+                record["resource"], record["access_granted"], record["ip_address"],
+                record["request_method"], record["response_status"]
+            ])
         
-        return StreamingHttpResponse(
+        return StreamingResponse(
             iter([output.getvalue()]),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=audit_logs_{datetime.now()}.csv"}
         )
     else:
-        return {"logs": [audit_schemas.AuditLogResponse.from_orm(log) for log in logs]}
\ No newline at end of file
+        return {
+            "logs": [audit_schemas.AuditLogResponse.from_orm(log) for log in logs]
+                  + [audit_schemas.AuditLogResponse(**record) for record in archived]
+        }
+
+@router.get("/stream")
+async def stream_audit_logs(
+    request: Request,
+    user_id: Optional[int] = Query(None),
+    resource: Optional[str] = Query(None),
+    access_granted: Optional[bool] = Query(None),
+    response_status: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream new audit events as Server-Sent Events.
+    Events are pushed from memory as they are logged, so subscribers
+    cost no database reads. Clients that fall too far behind are disconnected.
+    """
+    if not validate_access(current_user, "audit_logs", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to access audit logs")
+
+    # Don't hold a pooled connection for the lifetime of the stream
+    db.close()
+
+    subscriber = broadcaster.subscribe(
+        user_id=user_id,
+        resource=resource,
+        access_granted=access_granted,
+        response_status=response_status
+    )
+
+    async def event_stream():
+        try:
+            while not subscriber.disconnected:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(),
+                        timeout=settings.AUDIT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: audit\ndata: {json.dumps(event)}\n\n"
+
+            # The buffer overflowed and the broadcaster dropped this subscriber
+            yield "event: overflow\ndata: {}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,32 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status # type: ignore
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status # type: ignore
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models import permission as permission_models
+from ..models.user import User
+from ..models.role import Role
 from ..schemas import permission as permission_schemas
-from ..utils.auth import get_current_user, validate_access
+from ..schemas import user as user_schemas
+from ..utils.auth import get_current_user, validate_access, oauth2_scheme
 from ..utils.audit_logger import log_access_attempt
+from ..utils import policy_cache
+from ..utils.access_index import users_with_access
 
 router = APIRouter(prefix="/permissions", tags=["permissions"])
 
 @router.get("/", response_model=List[permission_schemas.Permission])
 async def read_permissions(
-    db: Session = Depends(get_db),
-    current_user: permission_models.User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
 ):
+    cached = policy_cache.cached_policy_response(request, db, "permissions", token, "permissions", "read")
+    if cached is not None:
+        return cached
+
+    current_user = await get_current_user(token, db)
     if not validate_access(current_user, "permissions", "read", db):
         log_access_attempt(db, current_user, "read", "permissions", False)
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    policy_cache.remember_grants(current_user)
     
     permissions = db.query(permission_models.Permission).all()
     log_access_attempt(db, current_user, "read", "permissions", True)
-    return permissions
+    return policy_cache.policy_response(
+        request, "permissions", List[permission_schemas.Permission], permissions
+    )
 
 @router.post("/", response_model=permission_schemas.Permission)
 async def create_permission(
     permission: permission_schemas.PermissionCreate,
     db: Session = Depends(get_db),
-    current_user: permission_models.User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     # Only admin can create permissions
     is_admin = any(role.name == "admin" for role in current_user.roles)
@@ -38,6 +52,7 @@ async def create_permission(
     db.add(db_permission)
     db.commit()
     db.refresh(db_permission)
+    policy_cache.bump_policy_generation()
     
     log_access_attempt(db, current_user, "create", "permissions", True)
     return db_permission
@@ -45,16 +60,53 @@ async def create_permission(
 @router.get("/role/{role_id}", response_model=List[permission_schemas.Permission])
 async def read_role_permissions(
     role_id: int,
-    db: Session = Depends(get_db),
-    current_user: permission_models.User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
 ):
+    cache_key = f"permissions/role/{role_id}"
+    cached = policy_cache.cached_policy_response(request, db, cache_key, token, "permissions", "read")
+    if cached is not None:
+        return cached
+
+    current_user = await get_current_user(token, db)
     if not validate_access(current_user, "permissions", "read", db):
         log_access_attempt(db, current_user, "read", "permissions", False)
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    policy_cache.remember_grants(current_user)
     
-    role = db.query(permission_models.Role).filter(permission_models.Role.id == role_id).first()
+    role = db.query(Role).filter(Role.id == role_id).first()
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     
     log_access_attempt(db, current_user, "read", "permissions", True)
-    return role.permissions
\ No newline at end of file
+    return policy_cache.policy_response(
+        request, cache_key, List[permission_schemas.Permission], role.permissions
+    )
+
+@router.get("/access", response_model=user_schemas.UsersWithAccess)
+async def read_users_with_access(
+    resource: str,
+    action: str,
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, gt=0, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Users who can perform `action` on `resource` through any of their roles.
+    Paginated by user id: pass the returned next_after_id to get the next page.
+    """
+    if not (validate_access(current_user, "permissions", "read", db)
+            and validate_access(current_user, "users", "read", db)):
+        log_access_attempt(db, current_user, "read", "permissions", False)
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    users = users_with_access(db, resource, action, after_id, limit)
+    log_access_attempt(db, current_user, "read", "permissions", True)
+    return {
+        "resource": resource,
+        "action": action,
+        "users": users,
+        "next_after_id": users[-1]["id"] if len(users) == limit else None
+    }
\ No newline at end of file
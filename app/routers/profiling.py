@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException # type: ignore
+from fastapi.responses import PlainTextResponse # type: ignore
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User
+from ..utils.auth import get_current_user, validate_access
+from ..utils import profiler
+
+router = APIRouter(prefix="/profiling", tags=["profiling"])
+
+def _get_profile(profile_id: str) -> profiler.RequestProfile:
+    profile = profiler.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/profiles")
+async def list_profiles(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the most recent request profiles, newest first"""
+    if not validate_access(current_user, "profiling", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to access profiles")
+
+    return [profile.summary() for profile in reversed(profiler.profiles)]
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a profile's summary and per-statement SQL timings"""
+    if not validate_access(current_user, "profiling", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to access profiles")
+
+    profile = _get_profile(profile_id)
+    return {**profile.summary(), "sql": profile.sql}
+
+@router.get("/profiles/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_folded(
+    profile_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a profile's stack samples in collapsed format for flamegraph tools"""
+    if not validate_access(current_user, "profiling", "read", db):
+        raise HTTPException(status_code=403, detail="Not enough permissions to access profiles")
+
+    return _get_profile(profile_id).folded()
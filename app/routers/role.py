@@ -1,33 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, status # type: ignore
+from fastapi import APIRouter, Depends, HTTPException, Request, status # type: ignore
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models import role as role_models
+from ..models.user import User
+from ..models.permission import Permission
 from ..schemas import role as role_schemas
-from ..utils.auth import get_current_user, validate_access
+from ..utils.auth import get_current_user, validate_access, oauth2_scheme
 from ..utils.audit_logger import log_access_attempt
+from ..utils import policy_cache
+from ..utils.access_index import access_index
+from ..models.user import user_role
 
 router = APIRouter(prefix="/roles", tags=["roles"])
 
 @router.get("/", response_model=List[role_schemas.Role])
 async def read_roles(
-    db: Session = Depends(get_db),
-    current_user: role_models.User = Depends(get_current_user)
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
 ):
+    cached = policy_cache.cached_policy_response(request, db, "roles", token, "roles", "read")
+    if cached is not None:
+        return cached
+
+    current_user = await get_current_user(token, db)
     if not validate_access(current_user, "roles", "read", db):
         log_access_attempt(db, current_user, "read", "roles", False)
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    policy_cache.remember_grants(current_user)
     
     roles = db.query(role_models.Role).all()
     log_access_attempt(db, current_user, "read", "roles", True)
-    return roles
+    return policy_cache.policy_response(request, "roles", List[role_schemas.Role], roles)
 
 @router.get("/{role_id}", response_model=role_schemas.Role)
 async def read_role(
+    role_id: int,
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+):
+    cache_key = f"roles/{role_id}"
+    cached = policy_cache.cached_policy_response(request, db, cache_key, token, "roles", "read")
+    if cached is not None:
+        return cached
+
+    current_user = await get_current_user(token, db)
+    if not validate_access(current_user, "roles", "read", db):
+        log_access_attempt(db, current_user, "read", "roles", False)
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    policy_cache.remember_grants(current_user)
+    
+    role = db.query(role_models.Role).filter(role_models.Role.id == role_id).first()
+    if role is None:
+        raise HTTPException(status_code=404, detail="Role not found")
+    
+    log_access_attempt(db, current_user, "read", "roles", True)
+    return policy_cache.policy_response(request, cache_key, role_schemas.Role, role)
+
+@router.get("/{role_id}/access", response_model=role_schemas.RoleAccess)
+async def read_role_access(
     role_id: int,
     db: Session = Depends(get_db),
-    current_user: role_models.User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
+    """What (resource, action) pairs the role grants, and how many users hold it"""
     if not validate_access(current_user, "roles", "read", db):
         log_access_attempt(db, current_user, "read", "roles", False)
         raise HTTPException(status_code=403, detail="Not enough permissions")
@@ -36,15 +75,31 @@ async def read_role(
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     
+    # Active holders only, matching /permissions/access
+    user_count = db.query(func.count(user_role.c.user_id))\
+        .join(User, User.id == user_role.c.user_id)\
+        .filter(user_role.c.role_id == role_id, User.is_active.is_(True))\
+        .scalar()
+    
+    # Built before logging, whose commit would expire the role
+    role_access = {
+        "id": role.id,
+        "name": role.name,
+        "grants": [
+            {"resource": resource, "action": action}
+            for resource, action in access_index.role_grants(db, role_id)
+        ],
+        "user_count": user_count
+    }
     log_access_attempt(db, current_user, "read", "roles", True)
-    return role
+    return role_access
 
 @router.put("/{role_id}/permissions")
 async def assign_permissions_to_role(
     role_id: int,
     permission_ids: List[int],
     db: Session = Depends(get_db),
-    current_user: role_models.User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user)
 ):
     # Only admin can assign permissions
     is_admin = any(role.name == "admin" for role in current_user.roles)
@@ -56,12 +111,13 @@ async def assign_permissions_to_role(
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     
-    permissions = db.query(role_models.Permission)\
-        .filter(role_models.Permission.id.in_(permission_ids))\
+    permissions = db.query(Permission)\
+        .filter(Permission.id.in_(permission_ids))\
         .all()
     
     role.permissions = permissions
     db.commit()
+    policy_cache.bump_policy_generation()
     
     log_access_attempt(db, current_user, "update", "roles", True, "Assigned permissions to role")
     return {"message": "Permissions assigned successfully"}
\ No newline at end of file
@@ -3,9 +3,12 @@ from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models import user as user_models
+from ..models.role import Role
 from ..schemas import user as user_schemas
 from ..utils.auth import get_password_hash, get_current_user, validate_access
+from ..utils.revocation import revoke_user_tokens
 from ..utils.audit_logger import log_access_attempt
+from ..utils import policy_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -89,9 +92,51 @@ async def assign_role_to_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     # Clear existing roles and assign new ones
-    roles = db.query(user_models.Role).filter(user_models.Role.id.in_(role_ids)).all()
+    roles = db.query(Role).filter(Role.id.in_(role_ids)).all()
     db_user.roles = roles
     db.commit()
+    policy_cache.bump_policy_generation()
     
     log_access_attempt(db, current_user, "update", "users", True, "Assigned roles to user")
-    return {"message": "Roles assigned successfully"}
\ No newline at end of file
+    return {"message": "Roles assigned successfully"}
+
+@router.post("/{user_id}/revoke-tokens")
+async def revoke_tokens_for_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: user_models.User = Depends(get_current_user)
+):
+    if not validate_access(current_user, "users", "update", db):
+        log_access_attempt(db, current_user, "update", "users", False)
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db_user = db.query(user_models.User).filter(user_models.User.id == user_id).first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Every token issued so far stops working; the user has to log in again
+    revoke_user_tokens(db, db_user.username)
+    
+    log_access_attempt(db, current_user, "update", "users", True, "Revoked user tokens")
+    return {"message": "Tokens revoked successfully"}
+
+@router.put("/{user_id}/deactivate")
+async def deactivate_user(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: user_models.User = Depends(get_current_user)
+):
+    if not validate_access(current_user, "users", "update", db):
+        log_access_attempt(db, current_user, "update", "users", False)
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    
+    db_user = db.query(user_models.User).filter(user_models.User.id == user_id).first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    db_user.is_active = False
+    db.commit()
+    revoke_user_tokens(db, db_user.username)
+    
+    log_access_attempt(db, current_user, "update", "users", True, "Deactivated user")
+    return {"message": "User deactivated successfully"}
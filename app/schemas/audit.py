@@ -19,7 +19,11 @@ class AuditLogCreate(AuditLogBase):
 
 class AuditLogResponse(AuditLogBase):
     id: int
-    user_id: int
+    user_id: Optional[int] = None  # None for anonymous requests
+    # None for access checks recorded by log_access_attempt rather than the middleware
+    request_method: Optional[str] = None
+    request_path: Optional[str] = None
+    response_status: Optional[int] = None
     timestamp: datetime
     username: Optional[str] = None  # Added for response convenience
 
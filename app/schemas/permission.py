@@ -14,4 +14,8 @@ class Permission(PermissionBase):
     id: int
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class AccessGrant(BaseModel):
+    resource: str
+    action: str
\ No newline at end of file
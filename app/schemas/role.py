@@ -1,4 +1,4 @@
-from app.models.permission import Permission
+from .permission import Permission, AccessGrant
 from pydantic import BaseModel # type: ignore
 from typing import List, Optional
 
@@ -14,4 +14,10 @@ class Role(RoleBase):
     permissions: List["Permission"]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class RoleAccess(BaseModel):
+    id: int
+    name: str
+    grants: List[AccessGrant]
+    user_count: int
\ No newline at end of file
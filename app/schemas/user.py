@@ -1,4 +1,4 @@
-from app.models.role import Role
+from .role import Role
 from pydantic import BaseModel, EmailStr # type: ignore
 from typing import List, Optional
 
@@ -18,4 +18,17 @@ class User(UserBase):
     roles: List["Role"]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class UserSummary(UserBase):
+    id: int
+    is_active: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+class UsersWithAccess(BaseModel):
+    resource: str
+    action: str
+    users: List[UserSummary]
+    next_after_id: Optional[int] = None  # Pass as after_id for the next page
\ No newline at end of file
@@ -0,0 +1,64 @@
+import os
+import shutil
+import tempfile
+
+# Settings are read at import time, so point them at throwaway storage first
+_test_dir = tempfile.mkdtemp(prefix="rbac-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_test_dir}/test.db"
+os.environ["AUDIT_ARCHIVE_DIR"] = os.path.join(_test_dir, "audit_archive")
+os.environ["SCHEMA_CHECK_ON_STARTUP"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient # type: ignore
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.utils import access_alerts, audit_analytics, audit_archive, policy_cache
+from app.utils.init_db import init_db
+from app.utils.revocation import revocations
+
+
+@pytest.fixture(autouse=True)
+def database():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        init_db(db)
+    finally:
+        db.close()
+    # Module-level caches outlive a test; start each one empty
+    policy_cache.bump_policy_generation()
+    shutil.rmtree(os.environ["AUDIT_ARCHIVE_DIR"], ignore_errors=True)
+    audit_archive._index_cache.clear()
+    audit_analytics.aggregator.buckets.clear()
+    revocations.__init__()
+    for tracker in (access_alerts.user_denials, access_alerts.ip_denials):
+        tracker.counters.clear()
+        tracker.breached_at.clear()
+    yield
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def login(client, username="admin", password="admin123"):
+    response = client.post("/token", data={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def admin_headers(client):
+    return login(client)
@@ -0,0 +1,96 @@
+import asyncio
+from fastapi import FastAPI # type: ignore
+from fastapi.testclient import TestClient # type: ignore
+from app.middleware import admission as admission_middleware
+from app.utils.admission import AdmissionController, RouteClass
+
+
+def make_controller(max_concurrency=1, limit=1, queue_size=1, deadline=1.0):
+    return AdmissionController(max_concurrency, [
+        RouteClass("auth", 0, limit, queue_size, deadline),
+        RouteClass("admin", 1, limit, queue_size, deadline),
+        RouteClass("analytics", 2, limit, queue_size, deadline),
+    ])
+
+
+def test_full_queue_is_shed_and_waiters_time_out():
+    async def scenario():
+        controller = make_controller(deadline=0.05)
+        admin = controller.by_name["admin"]
+        assert await controller.acquire(admin)
+
+        waiter = asyncio.create_task(controller.acquire(admin))
+        await asyncio.sleep(0)
+        # One request running and one queued: the next one is rejected outright
+        assert await controller.acquire(admin) is False
+        assert await waiter is False
+        return admin.status()
+
+    status = asyncio.run(scenario())
+    assert (status["admitted"], status["rejected"], status["timed_out"]) == (1, 1, 1)
+    assert (status["active"], status["queued"]) == (1, 0)
+
+
+def test_freed_slot_goes_to_the_highest_priority_class():
+    async def scenario():
+        controller = make_controller()
+        auth, analytics = controller.by_name["auth"], controller.by_name["analytics"]
+        assert await controller.acquire(analytics)
+
+        order = []
+
+        async def request(route_class):
+            assert await controller.acquire(route_class)
+            order.append(route_class.name)
+            controller.release(route_class)
+
+        queued = [asyncio.create_task(request(analytics)), asyncio.create_task(request(auth))]
+        await asyncio.sleep(0)
+        controller.release(analytics)
+        await asyncio.gather(*queued)
+        return order, controller.active
+
+    order, active = asyncio.run(scenario())
+    assert order == ["auth", "analytics"]
+    assert active == 0
+
+
+def test_classify_routes():
+    controller = make_controller()
+    assert controller.classify("/token").name == "auth"
+    assert controller.classify("/audit/logs/export").name == "analytics"
+    assert controller.classify("/roles/1").name == "admin"
+    assert controller.classify("/audit/stream") is None
+    assert controller.classify("/docs") is None
+
+
+def test_middleware_answers_503_when_shed(monkeypatch):
+    controller = make_controller(limit=0, queue_size=0)
+    monkeypatch.setattr(admission_middleware, "controller", controller)
+    app = FastAPI()
+    app.add_middleware(admission_middleware.AdmissionMiddleware)
+
+    @app.get("/roles/")
+    async def roles():
+        return []
+
+    @app.get("/")
+    async def root():
+        return {}
+
+    client = TestClient(app)
+    response = client.get("/roles/")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(admission_middleware.settings.ADMISSION_RETRY_AFTER_SECONDS)
+    assert client.get("/").status_code == 200
+    assert controller.by_name["admin"].rejected == 1
+
+
+def test_admission_status_endpoint(client, admin_headers):
+    response = client.get("/admission/status", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [route_class["name"] for route_class in body["classes"]] == ["auth", "admin", "analytics"]
+    # The status request itself holds an admin slot
+    assert body["active"] == 1
+    assert body["classes"][1]["active"] == 1
@@ -0,0 +1,82 @@
+import time
+from fastapi.testclient import TestClient # type: ignore
+from conftest import login
+from app.main import app
+from app.models.role import Role
+from app.models.user import User
+from app.utils import access_alerts
+from app.utils.access_alerts import DeniedAccessTracker, SlidingWindowCounter
+from app.utils.auth import get_password_hash
+
+
+def test_sliding_window_counter_expires_whole_buckets():
+    counter = SlidingWindowCounter(window_seconds=60, bucket_seconds=10)
+    for now in (0, 5, 15, 30):
+        counter.add(now)
+
+    assert counter.count(30) == 4
+    assert counter.count(30, window_seconds=20) == 2
+    # The 0-10s bucket leaves the window once it is entirely past 60s
+    assert counter.count(69) == 4
+    assert counter.count(70) == 2
+    assert counter.count(200) == 0
+
+
+def test_tracker_flags_breaches_and_bounds_keys():
+    tracker = DeniedAccessTracker("ip_address", threshold=3, max_keys=2)
+    for _ in range(3):
+        tracker.record("10.0.0.1", 100)
+    tracker.record("10.0.0.2", 100)
+
+    [first, second] = tracker.offenders(100)
+    assert first == {"ip_address": "10.0.0.1", "denied": 3, "breached": True, "breached_since": 100}
+    assert second["breached"] is False
+
+    # A third key evicts the least recently denied one
+    tracker.record("10.0.0.3", 101)
+    assert [o["ip_address"] for o in tracker.offenders(101)] == ["10.0.0.2", "10.0.0.3"]
+
+    # Once the window has passed, idle keys are dropped
+    assert tracker.offenders(1000) == []
+    assert not tracker.counters
+
+
+def test_alerts_endpoint_reports_denied_requests(client, admin_headers, db, monkeypatch):
+    monkeypatch.setattr(access_alerts.user_denials, "threshold", 3)
+    user = User(username="alice", email="alice@example.com",
+                hashed_password=get_password_hash("secret"), is_active=True)
+    user.roles = [db.query(Role).filter(Role.name == "staff").first()]
+    db.add(user)
+    db.commit()
+
+    headers = login(client, "alice", "secret")
+    for _ in range(3):
+        assert client.get("/roles/1/access", headers=headers).status_code == 403
+
+    response = client.get("/audit/alerts", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["users"] == [
+        {"user_id": user.id, "denied": 3, "breached": True, "breached_since": body["users"][0]["breached_since"]}
+    ]
+    assert body["breaches"] == {"users": [user.id], "ips": []}
+    assert body["ips"][0]["denied"] == 3
+
+    assert client.get("/audit/alerts", headers=headers).status_code == 403
+
+
+def test_denied_validate_access_without_client_address(admin_headers, db):
+    # e.g. served over a unix socket, where the ASGI scope has no client
+    async def app_without_client(scope, receive, send):
+        await app({key: value for key, value in scope.items() if key != "client"}, receive, send)
+
+    response = TestClient(app_without_client).get(
+        "/validate-access",
+        params={"resource": "nothing", "action": "read"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json() == {"has_access": False}
+    assert [o["denied"] for o in access_alerts.user_denials.offenders(time.time())] == [1]
+    assert access_alerts.ip_denials.offenders(time.time()) == []
+
@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app.database import engine
+from app.models.audit_sketch import AuditSketch, AuditSketchRollup
+from app.utils import audit_analytics
+from app.utils.audit_analytics import (
+    COMPACTED_NODE, SketchAggregator, compact_sketches, merge_sketches, write_snapshot
+)
+from app.utils.sketches import HyperLogLog, TDigest
+
+
+def test_hyperloglog_counts_and_merges_distinct_values():
+    first, second = HyperLogLog(), HyperLogLog()
+    for i in range(3000):
+        first.add(f"user-{i}")
+    for i in range(2000, 5000):
+        second.add(f"user-{i}")
+    assert abs(first.count() - 3000) < 3000 * 0.05
+
+    first.merge(second)
+    restored = HyperLogLog.from_bytes(first.to_bytes())
+    assert abs(restored.count() - 5000) < 5000 * 0.05
+
+
+def test_tdigest_quantiles_survive_merge_and_round_trip():
+    first, second = TDigest(), TDigest()
+    for i in range(5000):
+        first.add(i)
+        second.add(5000 + i)
+    first.merge(second)
+    restored = TDigest.from_bytes(first.to_bytes())
+
+    assert restored.count() == 10000
+    assert abs(restored.quantile(0.5) - 5000) < 100
+    assert abs(restored.quantile(0.99) - 9900) < 50
+
+
+def test_aggregator_writes_changed_buckets_and_closes_old_ones(db):
+    aggregator = SketchAggregator()
+    aggregator.open_from = datetime(2024, 1, 1, 9)
+    for hour in (9, 10, 11):
+        aggregator.record(datetime(2024, 1, 1, hour, 5), "GET /roles/", 1, "10.0.0.1", 0.01)
+    now = datetime(2024, 1, 1, 11, 30)
+    assert len(aggregator.snapshot(now)) == 9
+
+    # The 09:00 bucket is closed: dropped from memory and no longer recorded
+    assert sorted(aggregator.buckets) == [datetime(2024, 1, 1, 10), datetime(2024, 1, 1, 11)]
+    aggregator.record(datetime(2024, 1, 1, 9, 59), "GET /roles/", 3, "10.0.0.3", 0.03)
+    assert aggregator.snapshot(now) == {}
+
+    aggregator.record(datetime(2024, 1, 1, 11, 30), "GET /roles/", 2, "10.0.0.2", 0.02)
+    snapshot = aggregator.snapshot(now)
+    assert {bucket for bucket, _, _ in snapshot} == {datetime(2024, 1, 1, 11)}
+    write_snapshot(db, snapshot)
+    write_snapshot(db, snapshot)
+
+    rows = db.query(AuditSketch).filter(AuditSketch.bucket_start == datetime(2024, 1, 1, 11)).all()
+    assert len(rows) == 3
+    latency = next(row for row in rows if row.metric == "latency")
+    assert TDigest.from_bytes(latency.sketch).count() == 2
+
+
+def add_sketch_rows(db, start, hours, nodes=("node-a", "node-b")):
+    """One request per node and hour, from user ids unique to the hour."""
+    for hour in range(hours):
+        bucket = start + timedelta(hours=hour)
+        for n, node in enumerate(nodes):
+            users, latency = HyperLogLog(), TDigest()
+            users.add(hour * 10 + n)
+            latency.add(hour)
+            db.add(AuditSketch(bucket_start=bucket, metric="distinct_users", key="GET /roles/",
+                               node=node, sketch=users.to_bytes()))
+            db.add(AuditSketch(bucket_start=bucket, metric="latency", key="GET /roles/",
+                               node=node, sketch=latency.to_bytes()))
+    db.commit()
+
+
+def test_compaction_merges_workers_and_rolls_up_closed_days(db):
+    add_sketch_rows(db, datetime(2024, 1, 1), hours=48)
+    before = merge_sketches(db)
+
+    # Two buckets and two flush intervals back: up to 2024-01-02 21:58
+    compacted = compact_sketches(db, now=datetime(2024, 1, 3))
+    assert compacted == 46
+    nodes = {node for (node,) in db.query(AuditSketch.node).filter(
+        AuditSketch.bucket_start < datetime(2024, 1, 2, 22)).distinct()}
+    assert nodes == {COMPACTED_NODE}
+    # 22:00 and 23:00 on 2024-01-02 are still open: 2 buckets x 2 nodes x 2 metrics
+    assert db.query(AuditSketch).filter(AuditSketch.node != COMPACTED_NODE).count() == 8
+    assert [day for (day,) in db.query(AuditSketchRollup.day_start).distinct()] == [datetime(2024, 1, 1)]
+
+    # Running again finds nothing new to do
+    assert compact_sketches(db, now=datetime(2024, 1, 3)) == 0
+    assert db.query(AuditSketchRollup).count() == 2
+
+    after = merge_sketches(db)
+    for metric in ("distinct_users", "latency"):
+        assert after[(metric, "GET /roles/")].count() == before[(metric, "GET /roles/")].count()
+    assert after[("latency", "GET /roles/")].count() == 96
+    assert abs(after[("distinct_users", "GET /roles/")].count() - 96) <= 2
+
+
+def test_merge_reads_rollups_for_whole_days_only(db):
+    add_sketch_rows(db, datetime(2024, 1, 1), hours=72)
+    compact_sketches(db, now=datetime(2024, 1, 4))
+
+    statements = []
+    listener = lambda conn, cursor, statement, parameters, *args: statements.append(parameters)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        # 2024-01-01 12:00 to 2024-01-02 23:30: half a day of buckets plus one rolled up day
+        merged = merge_sketches(db, datetime(2024, 1, 1, 12), datetime(2024, 1, 2, 23, 30), "GET /roles/")
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert merged[("latency", "GET /roles/")].count() == 72
+    assert abs(merged[("distinct_users", "GET /roles/")].count() - 72) <= 2
+    assert merged[("latency", "GET /roles/")].quantile(0) == 12
+    assert len(statements) == 3
+
+
+def test_analytics_endpoint_reports_flushed_requests(client, admin_headers):
+    for _ in range(3):
+        assert client.get("/roles/", headers=admin_headers).status_code == 200
+
+    # Requests only update memory; the background task does the writing
+    asyncio.run(audit_analytics.flush_sketches())
+
+    response = client.get(
+        "/audit/logs/analytics",
+        params={"route": "GET /roles/", "start_date": "2000-01-01T00:00:00Z"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    [route] = response.json()["routes"]
+    assert route["requests"] == 3
+    assert route["distinct_users"] == 1
+    assert route["distinct_ips"] == 1
+    assert route["processing_time"]["p50"] is not None
+
+
+def test_unmatched_paths_share_one_sketch_key(client):
+    for i in range(5):
+        assert client.get(f"/nope/{i}").status_code == 404
+
+    [bucket] = audit_analytics.aggregator.buckets.values()
+    assert {key for _, key in bucket} == {"GET <unmatched>"}
+    assert bucket[("latency", "GET <unmatched>")].count() == 5
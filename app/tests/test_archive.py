@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from app.database import engine
+from app.models.audit import AuditLog
+from app.models.user import User
+from app.utils import audit_archive
+
+
+def add_old_logs(db, count, start=datetime(2024, 1, 1)):
+    admin = db.query(User).filter(User.username == "admin").first()
+    for i in range(count):
+        db.add(AuditLog(
+            user_id=admin.id,
+            timestamp=start + timedelta(hours=i),
+            action="GET",
+            resource=f"/old/{i}",
+            access_granted=True,
+            request_method="GET",
+            request_path=f"/old/{i}",
+            response_status=200
+        ))
+    db.commit()
+
+
+def test_archive_moves_rows_into_indexed_segments(db, monkeypatch):
+    monkeypatch.setattr(audit_archive.settings, "AUDIT_ARCHIVE_SEGMENT_ROWS", 4)
+    add_old_logs(db, 10)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        archived = audit_archive.archive_audit_logs(db, before=datetime(2024, 2, 1))
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert archived == 10
+    assert db.query(AuditLog).filter(AuditLog.resource.like("/old/%")).count() == 0
+    # Usernames come from the joined load, not one SELECT per row
+    assert not [s for s in statements if s.lstrip().startswith("SELECT") and "FROM audit_logs" not in s]
+
+    indexes = audit_archive.load_segment_indexes()
+    assert [index["rows"] for index in indexes] == [4, 4, 2]
+    records = list(audit_archive.query_archived_logs())
+    assert [record["resource"] for record in records] == [f"/old/{i}" for i in reversed(range(10))]
+    assert {record["username"] for record in records} == {"admin"}
+
+
+def test_archive_query_accepts_timezone_aware_bounds(db):
+    add_old_logs(db, 10)
+    audit_archive.archive_audit_logs(db, before=datetime(2024, 2, 1, tzinfo=timezone.utc))
+
+    # 05:00 to 07:00 UTC, written as +02:00
+    plus_two = timezone(timedelta(hours=2))
+    records = list(audit_archive.query_archived_logs(
+        start_date=datetime(2024, 1, 1, 7, tzinfo=plus_two),
+        end_date=datetime(2024, 1, 1, 9, tzinfo=plus_two)
+    ))
+    assert [record["resource"] for record in records] == ["/old/7", "/old/6", "/old/5"]
+
+
+def test_audit_logs_endpoint_continues_into_archive(client, admin_headers, db):
+    add_old_logs(db, 3)
+    audit_archive.archive_audit_logs(db, before=datetime(2024, 2, 1))
+
+    response = client.get(
+        "/audit/logs",
+        params={"start_date": "2024-01-01T00:30:00Z", "end_date": "2024-01-31T00:00:00Z"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    assert [log["resource"] for log in response.json()] == ["/old/2", "/old/1"]
+    assert response.json()[0]["username"] == "admin"
+
+    response = client.get("/audit/logs/export", params={"format": "json"}, headers=admin_headers)
+    assert response.status_code == 200
+    exported = {log["resource"] for log in response.json()["logs"]}
+    assert {"/old/0", "/old/1", "/old/2"} <= exported
@@ -0,0 +1,151 @@
+import asyncio
+import json
+from conftest import login
+from app.models.audit import AuditLog
+from app.models.role import Role
+from app.models.user import User
+from app.routers import audit as audit_router
+from app.utils import audit_stream
+from app.utils.audit_stream import broadcaster
+from app.utils.auth import get_password_hash
+
+
+def test_audit_middleware_logs_requests_with_a_body(client, db):
+    # Login goes through the full middleware stack and must not hang on its body
+    headers = login(client)
+    client.get("/roles/", headers=headers)
+
+    # Only rows written by the middleware have a request path
+    logs = db.query(AuditLog).filter(AuditLog.request_path.isnot(None)).order_by(AuditLog.id).all()
+    assert [log.request_path for log in logs] == ["/token", "/roles/"]
+    assert logs[0].user_id is None
+    assert logs[1].user_id is not None
+    assert logs[1].access_granted is True
+
+
+def test_audit_logs_include_anonymous_requests(client, admin_headers):
+    client.get("/")
+
+    response = client.get("/audit/logs", headers=admin_headers)
+    assert response.status_code == 200
+    assert None in [log["user_id"] for log in response.json()]
+
+    response = client.get("/audit/logs/export", params={"format": "json"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert any(log["user_id"] is None for log in response.json()["logs"])
+
+
+def test_audit_events_are_published_to_matching_subscribers(client, admin_headers):
+    everything = broadcaster.subscribe()
+    denied_only = broadcaster.subscribe(access_granted=False)
+    try:
+        client.get("/roles/", headers=admin_headers)
+        client.get("/roles/")
+
+        events = [everything.queue.get_nowait() for _ in range(everything.queue.qsize())]
+        assert [event["response_status"] for event in events] == [200, 401]
+        assert denied_only.queue.qsize() == 1
+        assert denied_only.queue.get_nowait()["request_path"] == "/roles/"
+    finally:
+        broadcaster.unsubscribe(everything)
+        broadcaster.unsubscribe(denied_only)
+
+
+def test_slow_subscriber_is_disconnected():
+    subscriber = broadcaster.subscribe()
+    for i in range(subscriber.queue.maxsize + 1):
+        broadcaster.publish({"id": i})
+
+    assert subscriber.disconnected
+    assert subscriber not in broadcaster.subscribers
+
+
+def test_audit_logs_include_access_checks(client, admin_headers):
+    assert client.get("/roles/", headers=admin_headers).status_code == 200
+
+    response = client.get("/audit/logs", params={"resource": "roles"}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    [check] = response.json()
+    assert (check["action"], check["access_granted"], check["request_path"]) == ("read", True, None)
+
+    response = client.get("/audit/logs/export", params={"format": "json"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert any(log["resource"] == "roles" for log in response.json()["logs"])
+
+
+def test_audit_stream_requires_read_permission(client, db):
+    user = User(username="alice", email="alice@example.com",
+                hashed_password=get_password_hash("secret"), is_active=True)
+    user.roles = [db.query(Role).filter(Role.name == "staff").first()]
+    db.add(user)
+    db.commit()
+
+    response = client.get("/audit/stream", headers=login(client, "alice", "secret"))
+    assert response.status_code == 403
+    assert not broadcaster.subscribers
+
+
+class StreamRequest:
+    """Stands in for the Request the stream polls for client disconnects."""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def open_stream(db, request, **filters):
+    admin = db.query(User).filter(User.username == "admin").first()
+    return audit_router.stream_audit_logs(
+        request, current_user=admin, db=db,
+        **{"user_id": None, "resource": None, "access_granted": None, "response_status": None, **filters}
+    )
+
+
+def test_audit_stream_sends_keep_alives_events_and_overflow(db, monkeypatch):
+    monkeypatch.setattr(audit_router.settings, "AUDIT_STREAM_HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(audit_stream.settings, "AUDIT_STREAM_BUFFER_SIZE", 2)
+
+    async def scenario():
+        response = await open_stream(db, StreamRequest(), resource="/roles/")
+        assert response.media_type == "text/event-stream"
+        stream = response.body_iterator
+        chunks = [await stream.__anext__()]
+
+        broadcaster.publish({"id": 1, "resource": "/users/"})
+        broadcaster.publish({"id": 2, "resource": "/roles/"})
+        chunks.append(await stream.__anext__())
+
+        # The buffer holds two events; the third disconnects the subscriber
+        for event_id in (3, 4, 5):
+            broadcaster.publish({"id": event_id, "resource": "/roles/"})
+        assert not broadcaster.subscribers
+        chunks.extend([chunk async for chunk in stream])
+        return chunks
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0] == ": keep-alive\n\n"
+    assert chunks[1] == f"id: 2\nevent: audit\ndata: {json.dumps({'id': 2, 'resource': '/roles/'})}\n\n"
+    # A dropped subscriber gets the overflow terminator instead of its backlog
+    assert chunks[2:] == ["event: overflow\ndata: {}\n\n"]
+
+
+def test_audit_stream_unsubscribes_when_the_client_goes_away(db):
+    async def scenario():
+        request = StreamRequest()
+        closed = (await open_stream(db, request)).body_iterator
+        disconnected = (await open_stream(db, request)).body_iterator
+        assert len(broadcaster.subscribers) == 2
+
+        broadcaster.publish({"id": 1})
+        await closed.__anext__()
+        await closed.aclose()
+        assert len(broadcaster.subscribers) == 1
+
+        request.disconnected = True
+        assert [chunk async for chunk in disconnected] == []
+        assert not broadcaster.subscribers
+
+    asyncio.run(scenario())
+
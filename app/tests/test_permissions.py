@@ -0,0 +1,87 @@
+from sqlalchemy import event
+from conftest import login
+from app.database import engine
+from app.models.role import Role
+from app.models.user import User
+from app.utils.auth import get_password_hash
+
+HASHED_PASSWORD = get_password_hash("secret")
+
+
+def add_users(db, count, role_name="staff", active=True):
+    role = db.query(Role).filter(Role.name == role_name).first()
+    for i in range(count):
+        user = User(
+            username=f"{role_name}{i}",
+            email=f"{role_name}{i}@example.com",
+            hashed_password=HASHED_PASSWORD,
+            is_active=active
+        )
+        user.roles = [role]
+        db.add(user)
+    db.commit()
+
+
+def test_users_with_access_pages_by_id(client, admin_headers, db):
+    add_users(db, 5)
+    params = {"resource": "api_one", "action": "access", "limit": 4}
+
+    first = client.get("/permissions/access", params=params, headers=admin_headers)
+    assert first.status_code == 200
+    page = first.json()
+    # admin and the five staff users can access api_one
+    assert [user["username"] for user in page["users"]] == ["admin", "staff0", "staff1", "staff2"]
+    assert page["next_after_id"] == page["users"][-1]["id"]
+
+    second = client.get(
+        "/permissions/access",
+        params={**params, "after_id": page["next_after_id"]},
+        headers=admin_headers
+    ).json()
+    assert [user["username"] for user in second["users"]] == ["staff3", "staff4"]
+    assert second["next_after_id"] is None
+
+
+def test_users_with_access_excludes_inactive_and_unrelated_users(client, admin_headers, db):
+    add_users(db, 2)
+    add_users(db, 2, role_name="supervisor", active=False)
+
+    response = client.get(
+        "/permissions/access",
+        params={"resource": "users", "action": "update"},
+        headers=admin_headers
+    )
+    assert [user["username"] for user in response.json()["users"]] == ["admin"]
+
+
+def test_users_with_access_query_count_does_not_grow_with_page_size(client, admin_headers, db):
+    add_users(db, 30)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = client.get(
+            "/permissions/access",
+            params={"resource": "api_one", "action": "access", "limit": 100},
+            headers=admin_headers
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+    assert len(response.json()["users"]) == 31
+    assert sum("FROM users" in statement for statement in statements) < 10
+
+
+def test_users_with_access_requires_permissions(client, db):
+    add_users(db, 1)
+    headers = login(client, "staff0", "secret")
+
+    response = client.get(
+        "/permissions/access",
+        params={"resource": "api_one", "action": "access"},
+        headers=headers
+    )
+    assert response.status_code == 403
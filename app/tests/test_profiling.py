@@ -0,0 +1,77 @@
+import threading
+import time
+from fastapi import FastAPI # type: ignore
+from fastapi.testclient import TestClient # type: ignore
+from sqlalchemy import create_engine, text
+from app.middleware import profiling as profiling_middleware
+from app.utils import profiler
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collects_stacks_and_peak_concurrency():
+    profile = profiler.RequestProfile("GET", "/busy")
+    sampler = profiler.StackSampler(profile, threading.get_ident(), 0.001, lambda: 3)
+    sampler.start()
+    busy_loop(0.1)
+    sampler.stop()
+
+    assert profile.summary()["samples"] > 0
+    assert profile.max_concurrent_requests == 3
+    assert "busy_loop" in profile.folded()
+
+
+def test_sql_timing_only_records_for_the_current_profile():
+    engine = create_engine("sqlite://")
+    profiler.install_sql_timing(engine)
+    profile = profiler.RequestProfile("GET", "/sql")
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        token = profiler.current_profile.set(profile)
+        try:
+            conn.execute(text("SELECT 2"))
+        finally:
+            profiler.current_profile.reset(token)
+
+    assert profile.sql_count == 1
+    assert profile.sql[0]["statement"] == "SELECT 2"
+
+
+def test_middleware_profiles_requests_with_the_header_secret(monkeypatch):
+    monkeypatch.setattr(profiling_middleware.settings, "PROFILING_HEADER_SECRET", "let-me-in")
+    monkeypatch.setattr(profiling_middleware.settings, "PROFILING_SAMPLE_RATE", 0.0)
+    app = FastAPI()
+    app.add_middleware(profiling_middleware.ProfilingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        busy_loop(0.05)
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert "x-profile-id" not in client.get("/work", headers={"X-Profile": "wrong"}).headers
+
+    response = client.get("/work", headers={"X-Profile": "let-me-in"})
+    profile = profiler.get_profile(response.headers["x-profile-id"])
+    assert profile is not None
+    assert profile.response_status == 200
+    assert profile.duration_ms >= 50
+    assert profile.max_concurrent_requests == 1
+
+
+def test_profile_endpoints_list_and_fold_profiles(client, admin_headers):
+    profile = profiler.RequestProfile("GET", "/roles/")
+    profile.stacks["main;handler"] += 2
+    profiler.profiles.append(profile)
+
+    response = client.get("/profiling/profiles", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == profile.id
+
+    response = client.get(f"/profiling/profiles/{profile.id}/folded", headers=admin_headers)
+    assert response.text == "main;handler 2"
+    assert client.get("/profiling/profiles/missing", headers=admin_headers).status_code == 404
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from app import database
+from app.database import Base, ReplicaRouter
+from app.models.audit import AuditLog
+from app.utils.init_db import init_db
+
+
+def make_replica(tmp_path, name):
+    replica = create_engine(f"sqlite:///{tmp_path}/{name}.db")
+    Base.metadata.create_all(bind=replica)
+    return replica
+
+
+def test_sessions_rotate_across_replicas(tmp_path):
+    replicas = [make_replica(tmp_path, "one"), make_replica(tmp_path, "two")]
+    router = ReplicaRouter(replicas)
+
+    indexes = []
+    for _ in range(4):
+        session, index = router.session()
+        assert session.get_bind() is replicas[index]
+        session.close()
+        indexes.append(index)
+    assert indexes == [0, 1, 0, 1]
+
+
+def test_unreachable_or_stale_replicas_fall_back(tmp_path, monkeypatch):
+    broken = create_engine(f"sqlite:///{tmp_path}/missing/dir/replica.db")
+    router = ReplicaRouter([broken, make_replica(tmp_path, "healthy")])
+
+    session, index = router.session()
+    session.close()
+    assert index == 1
+    assert router.unhealthy_until[0] > 0
+
+    # Too far behind the primary counts as unhealthy too
+    monkeypatch.setattr(database.settings, "REPLICA_MAX_STALENESS_SECONDS", 5.0)
+    monkeypatch.setattr(router, "_replication_lag", lambda replica: 30.0)
+    router.checked_at = [0.0, 0.0]
+    session, index = router.session()
+    session.close()
+    assert index is None
+    assert session.get_bind() is database.engine
+
+
+def test_query_errors_mark_the_replica_unhealthy(tmp_path, monkeypatch):
+    router = ReplicaRouter([make_replica(tmp_path, "replica")])
+    monkeypatch.setattr(database, "replica_router", router)
+
+    sessions = database.get_read_db()
+    next(sessions)
+    with pytest.raises(OperationalError):
+        sessions.throw(OperationalError("SELECT 1", {}, Exception("connection lost")))
+    assert router.session()[1] is None
+
+
+def test_audit_reads_are_served_by_the_replica(tmp_path, monkeypatch, client, admin_headers):
+    replica = make_replica(tmp_path, "replica")
+    router = ReplicaRouter([replica])
+    session, _ = router.session()
+    try:
+        init_db(session)
+        session.add(AuditLog(action="GET", resource="/only-on-replica", access_granted=True))
+        session.commit()
+    finally:
+        session.close()
+    monkeypatch.setattr(database, "replica_router", router)
+
+    response = client.get("/audit/logs", params={"resource": "/only-on-replica"}, headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert [log["resource"] for log in response.json()] == ["/only-on-replica"]
@@ -0,0 +1,74 @@
+import time
+from datetime import datetime, timedelta
+from conftest import login
+from app.models.revoked_token import RevokedToken
+from app.models.role import Role
+from app.models.user import User
+from app.utils.auth import get_password_hash
+from app.utils.revocation import RevocationList
+
+HASHED_PASSWORD = get_password_hash("secret")
+
+
+def add_staff_user(db, username="alice"):
+    user = User(username=username, email=f"{username}@example.com",
+                hashed_password=HASHED_PASSWORD, is_active=True)
+    user.roles = [db.query(Role).filter(Role.name == "staff").first()]
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_logout_revokes_only_that_token(client):
+    first = login(client)
+    second = login(client)
+    assert client.post("/logout", headers=first).status_code == 200
+
+    assert client.get("/users/", headers=first).status_code == 401
+    assert client.get("/users/", headers=second).status_code == 200
+
+
+def test_revoke_tokens_rejects_earlier_tokens_only(client, admin_headers, db):
+    user = add_staff_user(db)
+    before = login(client, "alice", "secret")
+
+    response = client.post(f"/users/{user.id}/revoke-tokens", headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/users/", headers=before).status_code == 401
+    assert client.get("/users/", headers=login(client, "alice", "secret")).status_code == 200
+
+
+def test_deactivate_revokes_tokens_and_blocks_login(client, admin_headers, db):
+    user = add_staff_user(db)
+    headers = login(client, "alice", "secret")
+
+    response = client.put(f"/users/{user.id}/deactivate", headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/users/", headers=headers).status_code == 401
+    response = client.post("/token", data={"username": "alice", "password": "secret"})
+    assert response.status_code == 401
+
+
+def test_sync_picks_up_revocations_from_other_workers(db):
+    db.add(RevokedToken(jti="from-elsewhere", expires_at=datetime.utcnow() + timedelta(minutes=5)))
+    db.commit()
+
+    revocations = RevocationList()
+    revocations.sync(db)
+    assert revocations.is_revoked({"sub": "admin", "jti": "from-elsewhere"})
+    assert not revocations.is_revoked({"sub": "admin", "jti": "other"})
+
+
+def test_expired_entries_are_evicted():
+    revocations = RevocationList()
+    now = time.time()
+    revocations.add_jti("short", now + 0.05)
+    revocations.add_jti("long", now + 60)
+    revocations.add_user_cutoff("alice", now, now + 0.05)
+    assert revocations.is_revoked({"sub": "bob", "jti": "short"})
+
+    time.sleep(0.1)
+    assert not revocations.is_revoked({"sub": "alice", "iat": now - 1, "jti": "short"})
+    assert revocations.jtis.keys() == {"long"}
+    assert revocations.user_cutoffs == {}
+    assert [entry[2] for entry in revocations.expiry_heap] == ["long"]
@@ -0,0 +1,85 @@
+from app.models.audit import AuditLog
+from app.models.permission import Permission
+from app.models.role import Role
+from app.models.user import User
+from app.utils.auth import get_password_hash
+
+HASHED_PASSWORD = get_password_hash("secret")
+
+
+def test_role_access_lists_grants_and_active_holders(client, admin_headers, db):
+    staff = db.query(Role).filter(Role.name == "staff").first()
+    for name, active in [("alice", True), ("bob", False)]:
+        user = User(username=name, email=f"{name}@example.com",
+                    hashed_password=HASHED_PASSWORD, is_active=active)
+        user.roles = [staff]
+        db.add(user)
+    db.commit()
+
+    response = client.get(f"/roles/{staff.id}/access", headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["name"] == "staff"
+    assert body["user_count"] == 1
+    assert body["grants"] == [
+        {"resource": "api_one", "action": "access"},
+        {"resource": "api_two", "action": "access"},
+        {"resource": "users", "action": "read"},
+    ]
+
+
+def test_role_access_unknown_role(client, admin_headers):
+    response = client.get("/roles/999/access", headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_cached_role_reads_are_audited_by_the_middleware_only(client, admin_headers, db):
+    first = client.get("/roles/", headers=admin_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    # Second read is served from cache, third is a conditional revalidation
+    second = client.get("/roles/", headers=admin_headers)
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    not_modified = client.get("/roles/", headers={**admin_headers, "If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+    # Only the uncached read writes a handler-side access check
+    checks = db.query(AuditLog).filter(
+        AuditLog.resource == "roles",
+        AuditLog.request_path.is_(None)
+    ).count()
+    assert checks == 1
+
+    requests = db.query(AuditLog)\
+        .filter(AuditLog.request_path == "/roles/")\
+        .order_by(AuditLog.id)\
+        .all()
+    assert [log.response_status for log in requests] == [200, 200, 304]
+    assert requests[0].user_id is not None
+    assert {log.user_id for log in requests} == {requests[0].user_id}
+
+
+def test_role_write_invalidates_cached_reads(client, admin_headers, db):
+    etag = client.get("/roles/", headers=admin_headers).headers["etag"]
+
+    staff = db.query(Role).filter(Role.name == "staff").first()
+    permission = db.query(Permission).filter(Permission.name == "read_role").first()
+    response = client.put(
+        f"/roles/{staff.id}/permissions",
+        json=[permission.id],
+        headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+
+    response = client.get("/roles/", headers={**admin_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_cached_role_read_rejects_revoked_token(client, admin_headers):
+    assert client.get("/roles/", headers=admin_headers).status_code == 200
+    assert client.post("/logout", headers=admin_headers).status_code == 200
+    assert client.get("/roles/", headers=admin_headers).status_code == 401
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+import pytest
+from sqlalchemy import create_engine, inspect
+from app.database import Base, SCHEMA_VERSION, check_schema_version, engine
+from app.utils.startup_report import measure_imports, startup_report
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_migrations_build_the_model_schema(tmp_path):
+    url = f"sqlite:///{tmp_path}/migrated.db"
+    result = subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", "app/alembic/alembic.ini", "upgrade", "head"],
+        cwd=REPO_ROOT,
+        env={**os.environ, "DATABASE_URL": url},
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+    migrated = create_engine(url)
+    check_schema_version(migrated)
+    tables = set(inspect(migrated).get_table_names()) - {"alembic_version"}
+    assert tables == set(Base.metadata.tables)
+
+
+def test_schema_check_rejects_unversioned_database():
+    # The test database is built with create_all, so it has no alembic_version
+    with pytest.raises(RuntimeError, match=f"expected '{SCHEMA_VERSION}'"):
+        check_schema_version(engine)
+
+
+def test_app_import_skips_heavy_dependencies():
+    names = {name.strip() for name, _, _ in measure_imports("app.main")}
+    assert "app.main" in names
+    assert not names & {"numpy", "django", "pandas"}
+
+
+def test_startup_report_totals_top_level_imports():
+    report = startup_report("json.decoder", top_n=3)
+    lines = report.splitlines()
+    assert lines[0].startswith("Total import time for json.decoder: ")
+    assert len(lines) == 3 + 3
+    assert float(lines[0].split(": ")[1].split()[0]) > 0
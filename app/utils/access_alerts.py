@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Hashable, List, Optional
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class SlidingWindowCounter:
+    """Event count over a sliding window, kept as fixed-width time buckets."""
+
+    def __init__(self, window_seconds: int, bucket_seconds: int):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.buckets: Deque[List[int]] = deque()  # [bucket_start, count], oldest first
+        self.total = 0
+
+    def _expire(self, now: float):
+        horizon = now - self.window_seconds
+        while self.buckets and self.buckets[0][0] + self.bucket_seconds <= horizon:
+            self.total -= self.buckets.popleft()[1]
+
+    def add(self, now: float):
+        bucket_start = int(now // self.bucket_seconds * self.bucket_seconds)
+        if self.buckets and self.buckets[-1][0] == bucket_start:
+            self.buckets[-1][1] += 1
+        else:
+            self.buckets.append([bucket_start, 1])
+        self.total += 1
+        self._expire(now)
+
+    def count(self, now: float, window_seconds: Optional[int] = None) -> int:
+        self._expire(now)
+        if window_seconds is None or window_seconds >= self.window_seconds:
+            return self.total
+        horizon = now - window_seconds
+        return sum(count for start, count in self.buckets if start + self.bucket_seconds > horizon)
+
+
+class DeniedAccessTracker:
+    """
+    Sliding-window counts of denied requests per key (user id or IP).
+    At most `max_keys` keys are tracked; the least recently denied key is
+    dropped first, so a flood of distinct IPs can't grow memory unbounded.
+    """
+
+    def __init__(self, key_name: str, threshold: int, max_keys: int):
+        self.key_name = key_name
+        self.threshold = threshold
+        self.max_keys = max_keys
+        self.counters: "OrderedDict[Hashable, SlidingWindowCounter]" = OrderedDict()
+        self.breached_at = {}
+
+    def record(self, key: Hashable, now: float):
+        counter = self.counters.pop(key, None)
+        if counter is None:
+            counter = SlidingWindowCounter(
+                settings.ACCESS_ALERT_WINDOW_SECONDS,
+                settings.ACCESS_ALERT_BUCKET_SECONDS
+            )
+        counter.add(now)
+        self.counters[key] = counter
+
+        if counter.total >= self.threshold:
+            self.breached_at.setdefault(key, now)
+        while len(self.counters) > self.max_keys:
+            evicted, _ = self.counters.popitem(last=False)
+            self.breached_at.pop(evicted, None)
+
+    def offenders(self, now: float, window_seconds: Optional[int] = None, limit: int = 20) -> List[dict]:
+        counts = []
+        idle = []
+        for key, counter in self.counters.items():
+            denied = counter.count(now, window_seconds)
+            if denied:
+                counts.append((denied, key))
+            # Counts only fall between records, so stale state is cleared here
+            if counter.total < self.threshold:
+                self.breached_at.pop(key, None)
+            if counter.total == 0:
+                idle.append(key)
+        for key in idle:
+            del self.counters[key]
+        counts.sort(key=lambda item: item[0], reverse=True)
+
+        return [
+            {
+                self.key_name: key,
+                "denied": denied,
+                "breached": key in self.breached_at,
+                "breached_since": self.breached_at.get(key),
+            }
+            for denied, key in counts[:limit]
+        ]
+
+
+user_denials = DeniedAccessTracker("user_id", settings.ACCESS_ALERT_USER_THRESHOLD, settings.ACCESS_ALERT_MAX_KEYS)
+ip_denials = DeniedAccessTracker("ip_address", settings.ACCESS_ALERT_IP_THRESHOLD, settings.ACCESS_ALERT_MAX_KEYS)
+
+
+def record_denied_access(user_id: Optional[int], ip_address: Optional[str]):
+    now = time.time()
+    if user_id is not None:
+        user_denials.record(user_id, now)
+    if ip_address:
+        ip_denials.record(ip_address, now)
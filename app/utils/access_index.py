@@ -0,0 +1,85 @@
+import time
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.permission import Permission
+from ..models.role import role_permission
+from ..models.user import User, user_role
+from ..utils import policy_cache
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class AccessIndex:
+    """
+    Reverse index from (resource, action) to the roles granting it, and
+    from each role to its grants. Built with one join over role_permission.
+    It is rebuilt lazily when role/permission writes bump the policy
+    generation, or after POLICY_CACHE_TTL_SECONDS to pick up other workers' writes.
+    """
+
+    def __init__(self):
+        self.generation: Optional[int] = None
+        self.built_at = 0.0
+        self.roles_by_grant: Dict[Tuple[str, str], FrozenSet[int]] = {}
+        self.grants_by_role: Dict[int, List[Tuple[str, str]]] = {}
+
+    def _refresh(self, db: Session):
+        if self.generation == policy_cache.get_policy_generation() and \
+                time.monotonic() - self.built_at < settings.POLICY_CACHE_TTL_SECONDS:
+            return
+
+        generation = policy_cache.get_policy_generation()
+        rows = db.execute(
+            select(Permission.resource, Permission.action, role_permission.c.role_id)
+            .join(role_permission, role_permission.c.permission_id == Permission.id)
+        ).all()
+
+        roles_by_grant: Dict[Tuple[str, str], Set[int]] = {}
+        grants_by_role: Dict[int, Set[Tuple[str, str]]] = {}
+        for resource, action, role_id in rows:
+            roles_by_grant.setdefault((resource, action), set()).add(role_id)
+            grants_by_role.setdefault(role_id, set()).add((resource, action))
+
+        self.roles_by_grant = {grant: frozenset(roles) for grant, roles in roles_by_grant.items()}
+        self.grants_by_role = {role_id: sorted(grants) for role_id, grants in grants_by_role.items()}
+        self.generation = generation
+        self.built_at = time.monotonic()
+
+    def roles_with_access(self, db: Session, resource: str, action: str) -> FrozenSet[int]:
+        self._refresh(db)
+        return self.roles_by_grant.get((resource, action), frozenset())
+
+    def role_grants(self, db: Session, role_id: int) -> List[Tuple[str, str]]:
+        self._refresh(db)
+        return self.grants_by_role.get(role_id, [])
+
+
+access_index = AccessIndex()
+
+
+def users_with_access(
+    db: Session,
+    resource: str,
+    action: str,
+    after_id: int = 0,
+    limit: int = 100
+) -> List[dict]:
+    """
+    Active users holding any role that grants (resource, action), ordered by id.
+    Paginate by passing the last id seen as `after_id`; a single set-based
+    query, so deep pages cost the same as the first. Plain column rows are
+    returned, so a later commit can't expire them into per-user reloads.
+    """
+    role_ids = access_index.roles_with_access(db, resource, action)
+    if not role_ids:
+        return []
+
+    holders = select(user_role.c.user_id).where(user_role.c.role_id.in_(role_ids))
+    rows = db.query(User.id, User.username, User.email, User.is_active)\
+        .filter(User.id.in_(holders), User.id > after_id, User.is_active.is_(True))\
+        .order_by(User.id)\
+        .limit(limit)\
+        .all()
+    return [row._asdict() for row in rows]
@@ -0,0 +1,146 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class RouteClass:
+    """Concurrency limit, wait queue and counters for one class of routes."""
+
+    def __init__(self, name: str, priority: int, limit: int, queue_size: int, deadline: float):
+        self.name = name
+        self.priority = priority  # Lower runs first
+        self.limit = limit
+        self.queue_size = queue_size
+        self.deadline = deadline
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0  # Queue was full
+        self.timed_out = 0  # Waited past the deadline
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "priority": self.priority,
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self.waiters),
+            "queue_size": self.queue_size,
+            "deadline_seconds": self.deadline,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    """
+    Admits requests into a shared pool of ADMISSION_MAX_CONCURRENCY slots.
+    Each route class also has its own concurrency limit and a bounded
+    wait queue. Requests are shed when their class's queue is full or when
+    they wait past the class deadline. A freed slot goes to the waiting
+    request of the highest-priority class that is under its limit.
+    """
+
+    def __init__(self, max_concurrency: int, classes: List[RouteClass]):
+        self.max_concurrency = max_concurrency
+        self.classes = sorted(classes, key=lambda route_class: route_class.priority)
+        self.by_name: Dict[str, RouteClass] = {route_class.name: route_class for route_class in classes}
+        self.active = 0
+
+    def _can_run(self, route_class: RouteClass) -> bool:
+        return route_class.active < route_class.limit and self.active < self.max_concurrency
+
+    def _start(self, route_class: RouteClass):
+        route_class.active += 1
+        route_class.admitted += 1
+        self.active += 1
+
+    def _dispatch(self):
+        for route_class in self.classes:
+            while route_class.waiters and self._can_run(route_class):
+                waiter = route_class.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._start(route_class)
+                waiter.set_result(True)
+
+    async def acquire(self, route_class: RouteClass) -> bool:
+        """Wait for a slot. Returns False if the request should be shed."""
+        if not route_class.waiters and self._can_run(route_class):
+            self._start(route_class)
+            return True
+
+        if len(route_class.waiters) >= route_class.queue_size:
+            route_class.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        route_class.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=route_class.deadline)
+            return True
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the deadline passed
+                return True
+            route_class.timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away; give back a slot granted in the meantime
+            if waiter.done() and not waiter.cancelled():
+                self.release(route_class)
+            raise
+        finally:
+            if waiter in route_class.waiters:
+                route_class.waiters.remove(waiter)
+
+    def release(self, route_class: RouteClass):
+        route_class.active -= 1
+        self.active -= 1
+        self._dispatch()
+
+    def classify(self, path: str) -> Optional[RouteClass]:
+        """Route class for a path, or None if the path bypasses admission control."""
+        if path in ("/", "/openapi.json") or path.startswith(("/docs", "/redoc", "/audit/stream")):
+            return None
+        if path in ("/token", "/logout", "/validate-access"):
+            return self.by_name["auth"]
+        if path.startswith("/audit/logs"):
+            return self.by_name["analytics"]
+        return self.by_name["admin"]
+
+    def status(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "classes": [route_class.status() for route_class in self.classes],
+        }
+
+
+controller = AdmissionController(
+    settings.ADMISSION_MAX_CONCURRENCY,
+    [
+        RouteClass(
+            "auth", 0,
+            settings.ADMISSION_AUTH_CONCURRENCY,
+            settings.ADMISSION_AUTH_QUEUE_SIZE,
+            settings.ADMISSION_AUTH_DEADLINE_SECONDS
+        ),
+        RouteClass(
+            "admin", 1,
+            settings.ADMISSION_ADMIN_CONCURRENCY,
+            settings.ADMISSION_ADMIN_QUEUE_SIZE,
+            settings.ADMISSION_ADMIN_DEADLINE_SECONDS
+        ),
+        RouteClass(
+            "analytics", 2,
+            settings.ADMISSION_ANALYTICS_CONCURRENCY,
+            settings.ADMISSION_ANALYTICS_QUEUE_SIZE,
+            settings.ADMISSION_ANALYTICS_DEADLINE_SECONDS
+        ),
+    ]
+)
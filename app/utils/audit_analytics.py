@@ -0,0 +1,302 @@
+import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.audit_sketch import AuditSketch, AuditSketchRollup
+from ..utils.sketches import HyperLogLog, TDigest
+from ..config import get_settings
+
+settings = get_settings()
+
+# Each worker persists its own sketches; readers merge across workers
+NODE_ID = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# Node of a bucket's sketches once compact_sketches has merged all workers' rows
+COMPACTED_NODE = "*"
+
+# Sketch key for requests that matched no route
+UNMATCHED_ROUTE = "<unmatched>"
+
+# AUDIT_SKETCH_BUCKET_SECONDS must divide a day for the daily rollups to line up
+DAY = timedelta(days=1)
+
+SKETCH_TYPES = {
+    "distinct_users": HyperLogLog,
+    "distinct_ips": HyperLogLog,
+    "latency": TDigest,
+}
+
+
+def bucket_start(moment: datetime) -> datetime:
+    seconds = settings.AUDIT_SKETCH_BUCKET_SECONDS
+    epoch = int((moment - datetime(1970, 1, 1)).total_seconds())
+    return datetime.utcfromtimestamp(epoch - epoch % seconds)
+
+
+def day_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def _bucket_width() -> timedelta:
+    return timedelta(seconds=settings.AUDIT_SKETCH_BUCKET_SECONDS)
+
+
+class SketchAggregator:
+    """
+    Sketches per time bucket, updated in memory as audit events are written.
+    Recording never touches the database; flush_periodically writes the
+    buckets that changed to audit_sketches every AUDIT_SKETCH_FLUSH_SECONDS
+    from a worker thread.
+
+    Only the current and the previous bucket accept events. Older buckets
+    are dropped at the next flush and never written again, which is what
+    lets compact_sketches treat them as final.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[datetime, Dict[Tuple[str, str], object]] = {}
+        self.dirty: Set[datetime] = set()
+        self.open_from = bucket_start(datetime.utcnow()) - _bucket_width()
+
+    def _sketch(self, bucket: datetime, metric: str, key: str):
+        sketches = self.buckets.setdefault(bucket, {})
+        sketch = sketches.get((metric, key))
+        if sketch is None:
+            sketch = sketches[(metric, key)] = SKETCH_TYPES[metric]()
+        return sketch
+
+    def record(
+        self,
+        timestamp: datetime,
+        route: str,
+        user_id: Optional[int],
+        ip_address: Optional[str],
+        processing_time: float
+    ):
+        bucket = bucket_start(timestamp)
+        if bucket < self.open_from:
+            return  # Closed; a request that ran for over a bucket is not counted
+
+        self.dirty.add(bucket)
+        if user_id is not None:
+            self._sketch(bucket, "distinct_users", route).add(user_id)
+        if ip_address:
+            self._sketch(bucket, "distinct_ips", route).add(ip_address)
+        self._sketch(bucket, "latency", route).add(processing_time)
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[Tuple[datetime, str, str], bytes]:
+        """Serialize the buckets changed since the last snapshot, then close old buckets."""
+        snapshot = {
+            (bucket, metric, key): sketch.to_bytes()
+            for bucket in self.dirty
+            for (metric, key), sketch in self.buckets[bucket].items()
+        }
+        self.dirty = set()
+
+        self.open_from = bucket_start(now or datetime.utcnow()) - _bucket_width()
+        self.buckets = {
+            bucket: sketches for bucket, sketches in self.buckets.items() if bucket >= self.open_from
+        }
+        return snapshot
+
+    def flush(self, db: Session):
+        write_snapshot(db, self.snapshot())
+
+
+def write_snapshot(db: Session, snapshot: Dict[Tuple[datetime, str, str], bytes]):
+    """Write this worker's sketches, replacing its earlier flushes of the same buckets."""
+    if not snapshot:
+        return
+
+    buckets = {bucket for bucket, _, _ in snapshot}
+    existing = {
+        (row.bucket_start, row.metric, row.key): row
+        for row in db.query(AuditSketch)
+            .filter(AuditSketch.bucket_start.in_(buckets), AuditSketch.node == NODE_ID)
+            .all()
+    }
+    for (bucket, metric, key), data in snapshot.items():
+        row = existing.get((bucket, metric, key))
+        if row is None:
+            db.add(AuditSketch(
+                bucket_start=bucket,
+                metric=metric,
+                key=key,
+                node=NODE_ID,
+                sketch=data
+            ))
+        else:
+            row.sketch = data
+    db.commit()
+
+
+aggregator = SketchAggregator()
+
+
+def _merge_rows(rows: Iterable) -> Dict[Tuple[str, str], object]:
+    merged = {}
+    for row in rows:
+        sketch = SKETCH_TYPES[row.metric].from_bytes(row.sketch)
+        if (row.metric, row.key) in merged:
+            merged[(row.metric, row.key)].merge(sketch)
+        else:
+            merged[(row.metric, row.key)] = sketch
+    return merged
+
+
+def compact_sketches(db: Session, now: Optional[datetime] = None) -> int:
+    """
+    Merge every worker's rows for each closed bucket into one COMPACTED_NODE
+    row, then roll each closed day up into audit_sketch_rollups. Returns the
+    number of buckets compacted. Safe to run from several workers: a loser
+    fails on the unique constraints and its transaction is rolled back.
+    """
+    # No worker writes a bucket once it is two buckets old and has been
+    # flushed; allow two flush intervals for slow or late flushes
+    now = now or datetime.utcnow()
+    closed_before = now - 2 * _bucket_width() - timedelta(seconds=2 * settings.AUDIT_SKETCH_FLUSH_SECONDS)
+
+    buckets = [
+        bucket for (bucket,) in db.query(AuditSketch.bucket_start)
+            .filter(AuditSketch.node != COMPACTED_NODE, AuditSketch.bucket_start < closed_before)
+            .distinct()
+            .order_by(AuditSketch.bucket_start)
+    ]
+    for bucket in buckets:
+        # One query, so the rows merged are exactly the rows deleted
+        rows = db.query(AuditSketch).filter(AuditSketch.bucket_start == bucket).all()
+        merged = _merge_rows(rows)
+        for row in rows:
+            db.delete(row)
+        db.flush()
+        for (metric, key), sketch in merged.items():
+            db.add(AuditSketch(
+                bucket_start=bucket,
+                metric=metric,
+                key=key,
+                node=COMPACTED_NODE,
+                sketch=sketch.to_bytes()
+            ))
+        db.commit()
+
+    # Days are rolled up oldest first, so every day up to the latest rollup is done
+    rolled_through = db.query(func.max(AuditSketchRollup.day_start)).scalar()
+    pending = db.query(AuditSketch.bucket_start)\
+        .filter(AuditSketch.bucket_start < day_start(closed_before))
+    if rolled_through is not None:
+        pending = pending.filter(AuditSketch.bucket_start >= rolled_through + DAY)
+    days = sorted({day_start(bucket) for (bucket,) in pending.distinct()})
+
+    for day in days:
+        rows = db.query(AuditSketch)\
+            .filter(AuditSketch.bucket_start >= day, AuditSketch.bucket_start < day + DAY)\
+            .all()
+        for (metric, key), sketch in _merge_rows(rows).items():
+            db.add(AuditSketchRollup(day_start=day, metric=metric, key=key, sketch=sketch.to_bytes()))
+        db.commit()
+
+    return len(buckets)
+
+
+def _write_in_session(snapshot: Dict[Tuple[datetime, str, str], bytes]):
+    db = SessionLocal()
+    try:
+        write_snapshot(db, snapshot)
+    finally:
+        db.close()
+
+
+def _compact_in_session():
+    db = SessionLocal()
+    try:
+        compact_sketches(db)
+    finally:
+        db.close()
+
+
+async def flush_sketches():
+    """Snapshot on the event loop, where record() runs, and write from a thread."""
+    snapshot = aggregator.snapshot()
+    if not snapshot:
+        return
+    try:
+        await asyncio.to_thread(_write_in_session, snapshot)
+    except Exception as e:
+        print(f"Error flushing audit sketches: {str(e)}")
+
+
+async def flush_periodically():
+    while True:
+        await asyncio.sleep(settings.AUDIT_SKETCH_FLUSH_SECONDS)
+        await flush_sketches()
+
+
+async def compact_periodically():
+    while True:
+        await asyncio.sleep(settings.AUDIT_SKETCH_COMPACT_SECONDS)
+        try:
+            await asyncio.to_thread(_compact_in_session)
+        except Exception as e:
+            print(f"Error compacting audit sketches: {str(e)}")
+
+
+def merge_sketches(
+    db: Session,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    key: Optional[str] = None
+) -> Dict[Tuple[str, str], object]:
+    """
+    Merge persisted sketches per (metric, key) over the buckets overlapping
+    [start_date, end_date]. Whole days that have been rolled up are read
+    from audit_sketch_rollups, one row per day and key, so only the partial
+    days at either end and the days not yet rolled up read bucket rows.
+    CPU bound; call it off the event loop.
+    """
+    # Buckets are naive UTC; accept bounds given with an offset
+    if start_date and start_date.tzinfo:
+        start_date = start_date.astimezone(timezone.utc).replace(tzinfo=None)
+    if end_date and end_date.tzinfo:
+        end_date = end_date.astimezone(timezone.utc).replace(tzinfo=None)
+    first_bucket = bucket_start(start_date) if start_date else None
+
+    # Whole days in range that have a rollup: [first_day, last_day]
+    first_day = None
+    if first_bucket is not None:
+        first_day = day_start(first_bucket)
+        if first_day < first_bucket:
+            first_day += DAY
+    last_day = db.query(func.max(AuditSketchRollup.day_start)).scalar()
+    if last_day is not None and end_date:
+        last_day = min(last_day, day_start(end_date + _bucket_width()) - DAY)
+    use_rollups = last_day is not None and (first_day is None or first_day <= last_day)
+
+    rows = []
+    if use_rollups:
+        rollups = db.query(AuditSketchRollup).filter(AuditSketchRollup.day_start <= last_day)
+        if first_day is not None:
+            rollups = rollups.filter(AuditSketchRollup.day_start >= first_day)
+        if key:
+            rollups = rollups.filter(AuditSketchRollup.key == key)
+        rows.extend(rollups.all())
+
+    query = db.query(AuditSketch)
+    if first_bucket is not None:
+        query = query.filter(AuditSketch.bucket_start >= first_bucket)
+    if end_date:
+        query = query.filter(AuditSketch.bucket_start <= end_date)
+    if key:
+        query = query.filter(AuditSketch.key == key)
+    if use_rollups:
+        outside = AuditSketch.bucket_start >= last_day + DAY
+        if first_day is not None:
+            outside = or_(AuditSketch.bucket_start < first_day, outside)
+        query = query.filter(outside)
+    rows.extend(query.all())
+
+    return _merge_rows(rows)
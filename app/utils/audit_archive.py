@@ -0,0 +1,212 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy.orm import Session, joinedload
+from ..models.audit import AuditLog
+from ..config import get_settings
+
+settings = get_settings()
+
+# Columns copied from audit_logs into each archived record
+ARCHIVED_COLUMNS = [
+    "id", "user_id", "timestamp", "action", "resource", "resource_id",
+    "access_granted", "ip_address", "request_method", "request_path",
+    "request_body", "response_status", "additional_details",
+]
+
+SEGMENT_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".idx.json"
+
+# Parsed segment indexes, keyed by index file name
+_index_cache: Dict[str, dict] = {}
+
+
+def _archive_dir() -> str:
+    return settings.AUDIT_ARCHIVE_DIR
+
+
+def _min_max(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return [min(values), max(values)]
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Archived timestamps are naive UTC, like the audit_logs column."""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _serialize_log(log: AuditLog) -> dict:
+    record = {column: getattr(log, column) for column in ARCHIVED_COLUMNS}
+    record["timestamp"] = log.timestamp.isoformat() if log.timestamp else None
+    record["username"] = log.user.username if log.user else None
+    return record
+
+
+def _write_segment(records: List[dict]) -> str:
+    """
+    Write one compressed segment plus its min/max index.
+    The index is written last, so a segment without one is never read.
+    """
+    directory = _archive_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    first_id = records[-1]["id"]
+    last_id = records[0]["id"]
+    name = f"audit-{first_id:012d}-{last_id:012d}"
+    segment_path = os.path.join(directory, name + SEGMENT_SUFFIX)
+    index_path = os.path.join(directory, name + INDEX_SUFFIX)
+
+    with gzip.open(segment_path + ".tmp", "wt", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    os.replace(segment_path + ".tmp", segment_path)
+
+    index = {
+        "segment": name + SEGMENT_SUFFIX,
+        "rows": len(records),
+        "timestamp": _min_max(r["timestamp"] for r in records),
+        "user_id": _min_max(r["user_id"] for r in records),
+        "resource": _min_max(r["resource"] for r in records),
+    }
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(index_path + ".tmp", index_path)
+
+    return segment_path
+
+
+def archive_audit_logs(db: Session, before: Optional[datetime] = None) -> int:
+    """
+    Move audit logs older than `before` (default: AUDIT_ARCHIVE_AFTER_DAYS ago)
+    out of the audit_logs table and into compressed segment files.
+    Returns the number of rows archived.
+    """
+    if before is None:
+        before = datetime.utcnow() - timedelta(days=settings.AUDIT_ARCHIVE_AFTER_DAYS)
+    before = _naive_utc(before)
+
+    archived = 0
+    while True:
+        logs = db.query(AuditLog)\
+            .options(joinedload(AuditLog.user))\
+            .filter(AuditLog.timestamp < before)\
+            .order_by(AuditLog.timestamp.desc(), AuditLog.id.desc())\
+            .limit(settings.AUDIT_ARCHIVE_SEGMENT_ROWS)\
+            .all()
+        if not logs:
+            break
+
+        # Rows are only deleted once their segment is safely on disk
+        _write_segment([_serialize_log(log) for log in logs])
+        db.query(AuditLog)\
+            .filter(AuditLog.id.in_([log.id for log in logs]))\
+            .delete(synchronize_session=False)
+        db.commit()
+        archived += len(logs)
+
+    return archived
+
+
+def load_segment_indexes() -> List[dict]:
+    """Return the indexes of all complete segments, newest first."""
+    directory = _archive_dir()
+    if not os.path.isdir(directory):
+        return []
+
+    indexes = []
+    for file_name in os.listdir(directory):
+        if not file_name.endswith(INDEX_SUFFIX):
+            continue
+        if file_name not in _index_cache:
+            with open(os.path.join(directory, file_name), encoding="utf-8") as f:
+                _index_cache[file_name] = json.load(f)
+        indexes.append(_index_cache[file_name])
+
+    return sorted(
+        indexes,
+        key=lambda index: (index["timestamp"] or ["", ""])[1],
+        reverse=True
+    )
+
+
+def _segment_may_match(
+    index: dict,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    user_id: Optional[int],
+    resource: Optional[str]
+) -> bool:
+    timestamps = index["timestamp"]
+    if start_date and (timestamps is None or timestamps[1] < start_date.isoformat()):
+        return False
+    if end_date and (timestamps is None or timestamps[0] > end_date.isoformat()):
+        return False
+    if user_id:
+        user_ids = index["user_id"]
+        if user_ids is None or not user_ids[0] <= user_id <= user_ids[1]:
+            return False
+    if resource:
+        resources = index["resource"]
+        if resources is None or not resources[0] <= resource <= resources[1]:
+            return False
+    return True
+
+
+def query_archived_logs(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    action: Optional[str] = None,
+    resource: Optional[str] = None,
+    access_granted: Optional[bool] = None,
+    response_status: Optional[int] = None
+) -> Iterator[dict]:
+    """
+    Yield archived audit logs matching the same filters as /audit/logs,
+    newest first. Segments whose index rules out a match are never opened.
+    """
+    start_date = _naive_utc(start_date)
+    end_date = _naive_utc(end_date)
+    for index in load_segment_indexes():
+        if not _segment_may_match(index, start_date, end_date, user_id, resource):
+            continue
+
+        segment_path = os.path.join(_archive_dir(), index["segment"])
+        with gzip.open(segment_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["timestamp"]:
+                    record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+
+                if start_date and (record["timestamp"] is None or record["timestamp"] < start_date):
+                    continue
+                if end_date and (record["timestamp"] is None or record["timestamp"] > end_date):
+                    continue
+                if user_id and record["user_id"] != user_id:
+                    continue
+                if action and record["action"] != action:
+                    continue
+                if resource and record["resource"] != resource:
+                    continue
+                if access_granted is not None and record["access_granted"] != access_granted:
+                    continue
+                if response_status and record["response_status"] != response_status:
+                    continue
+
+                yield record
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        count = archive_audit_logs(db)
+        print(f"Archived {count} audit logs to {_archive_dir()}")
+    finally:
+        db.close()
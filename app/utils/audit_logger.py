@@ -1,4 +1,4 @@
-from sys import audit
+from typing import Optional
 from sqlalchemy.orm import Session
 from ..models.audit import AuditLog
 from ..models.user import User
@@ -9,15 +9,15 @@ def log_access_attempt(
     action: str,
     resource: str,
     access_granted: bool,
-    details: str = None
+    details: Optional[str] = None
 ):
     audit_log = AuditLog(
         user_id=user.id,
         action=action,
         resource=resource,
         access_granted=access_granted,
-        details=details
+        additional_details={"details": details} if details else None
     )
     db.add(audit_log)
     db.commit()
-    return audit
\ No newline at end of file
+    return audit_log
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Optional, Set
+from ..config import get_settings
+
+settings = get_settings()
+
+
+class AuditSubscriber:
+    """A single /audit/stream client with its own bounded event buffer."""
+
+    def __init__(
+        self,
+        user_id: Optional[int] = None,
+        resource: Optional[str] = None,
+        access_granted: Optional[bool] = None,
+        response_status: Optional[int] = None,
+        buffer_size: int = 100
+    ):
+        self.user_id = user_id
+        self.resource = resource
+        self.access_granted = access_granted
+        self.response_status = response_status
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.disconnected = False
+
+    def matches(self, event: dict) -> bool:
+        if self.user_id and event.get("user_id") != self.user_id:
+            return False
+        if self.resource and event.get("resource") != self.resource:
+            return False
+        if self.access_granted is not None and event.get("access_granted") != self.access_granted:
+            return False
+        if self.response_status and event.get("response_status") != self.response_status:
+            return False
+        return True
+
+
+class AuditBroadcaster:
+    """
+    In-process fan-out of audit events to stream subscribers.
+    Publishing never blocks: a subscriber whose buffer is full is
+    disconnected instead of slowing down the request that produced the event.
+    """
+
+    def __init__(self):
+        self.subscribers: Set[AuditSubscriber] = set()
+
+    def subscribe(self, **filters) -> AuditSubscriber:
+        subscriber = AuditSubscriber(buffer_size=settings.AUDIT_STREAM_BUFFER_SIZE, **filters)
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: AuditSubscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, event: dict):
+        for subscriber in list(self.subscribers):
+            if not subscriber.matches(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.disconnected = True
+                self.unsubscribe(subscriber)
+
+
+broadcaster = AuditBroadcaster()
@@ -1,3 +1,5 @@
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt # type: ignore
@@ -7,6 +9,7 @@ from fastapi.security import OAuth2PasswordBearer # type: ignore
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models.user import User
+from ..utils.revocation import revocations
 from ..config import get_settings
 
 settings = get_settings()
@@ -25,11 +28,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+    # jti identifies the token for revocation; iat orders it against per-user cutoffs
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def decode_token_payload(token: str) -> dict:
+    """Validate a token, including revocation, without touching the database."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -42,8 +47,24 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    if revocations.is_revoked(payload):
+        raise credentials_exception
+    return payload
+
+def decode_access_token(token: str) -> str:
+    """Validate a token without touching the database and return its username."""
+    return decode_token_payload(token)["sub"]
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    revocations.sync(db)
+    username = decode_access_token(token)
     user = db.query(User).filter(User.username == username).first()
-    if user is None:
+    if user is None or user.is_active is False:
         raise credentials_exception
     return user
 
@@ -40,7 +40,15 @@ def init_db(db: Session):
         # API access permissions
         {"name": "access_api_one", "description": "Access API One", "resource": "api_one", "action": "access"},
         {"name": "access_api_two", "description": "Access API Two", "resource": "api_two", "action": "access"},
-        {"name": "access_api_three", "description": "Access API Three", "resource": "api_three", "action": "access"}
+        {"name": "access_api_three", "description": "Access API Three", "resource": "api_three", "action": "access"},
+
+        # Audit log permissions
+        {"name": "read_audit_logs", "description": "View audit logs", "resource": "audit_logs", "action": "read"},
+        {"name": "export_audit_logs", "description": "Export audit logs", "resource": "audit_logs", "action": "export"},
+
+        # Diagnostics permissions
+        {"name": "read_profiles", "description": "View request profiles", "resource": "profiling", "action": "read"},
+        {"name": "read_admission", "description": "View admission control status", "resource": "admission", "action": "read"}
     ]
 
     for perm_data in permissions:
@@ -62,7 +70,7 @@ def init_db(db: Session):
 
     # Supervisor gets all except role and permission management
     supervisor_permissions = [p for p in all_permissions 
-                            if not any(x in p.name for x in ["update_role", "create_permission"])]
+                            if not any(x in p.name for x in ["update_role", "create_permission", "read_profiles", "read_admission"])]
     supervisor_role.permissions = supervisor_permissions
 
     # Staff gets basic access
@@ -0,0 +1,115 @@
+import hashlib
+import time
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+from fastapi import Request, Response # type: ignore
+from pydantic import TypeAdapter # type: ignore
+from sqlalchemy.orm import Session
+from ..models.user import User
+from ..utils.auth import decode_access_token
+from ..utils.revocation import revocations
+from ..config import get_settings
+
+settings = get_settings()
+
+# Bumped by every role/permission write; cache entries from an older
+# generation are never served. The generation is per process, so entries
+# also expire after POLICY_CACHE_TTL_SECONDS to pick up writes made by
+# other workers.
+_generation = 0
+
+# key -> (generation, stored_at, etag, body)
+_responses: Dict[str, Tuple[int, float, str, bytes]] = {}
+
+# username -> (generation, stored_at, {(resource, action), ...})
+_grants: Dict[str, Tuple[int, float, FrozenSet[Tuple[str, str]]]] = {}
+
+
+def get_policy_generation() -> int:
+    return _generation
+
+
+def bump_policy_generation():
+    global _generation
+    _generation += 1
+    _responses.clear()
+    _grants.clear()
+
+
+def _is_fresh(generation: int, stored_at: float) -> bool:
+    return generation == _generation and \
+        time.monotonic() - stored_at < settings.POLICY_CACHE_TTL_SECONDS
+
+
+def remember_grants(user: User):
+    """Cache the (resource, action) pairs the user's roles grant."""
+    grants = frozenset(
+        (permission.resource, permission.action)
+        for role in user.roles
+        for permission in role.permissions
+    )
+    _grants[user.username] = (_generation, time.monotonic(), grants)
+
+
+def has_cached_grant(username: str, resource: str, action: str) -> bool:
+    entry = _grants.get(username)
+    if entry is None or not _is_fresh(entry[0], entry[1]):
+        return False
+    return (resource, action) in entry[2]
+
+
+@lru_cache()
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _respond(request: Request, etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cached_policy_response(
+    request: Request,
+    db: Session,
+    key: str,
+    token: str,
+    resource: str,
+    action: str
+) -> Optional[Response]:
+    """
+    Answer a read from cache when both the caller's grants and the
+    serialized response are cached for the current policy generation.
+    No handler-side audit row is written: AuditMiddleware already records
+    the hit with the user, path and status (200 or 304).
+    Returns None when the caller must take the slow path.
+    """
+    # Pick up revocations from other workers, as get_current_user does;
+    # this only queries at most every REVOCATION_SYNC_SECONDS
+    revocations.sync(db)
+    username = decode_access_token(token)
+    if not has_cached_grant(username, resource, action):
+        return None
+
+    entry = _responses.get(key)
+    if entry is None or not _is_fresh(entry[0], entry[1]):
+        return None
+
+    return _respond(request, entry[2], entry[3])
+
+
+def policy_response(request: Request, key: str, schema: Any, data: Any) -> Response:
+    """Serialize `data` as `schema`, cache the bytes and respond with a strong ETag."""
+    adapter = _adapter(schema)
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    _responses[key] = (_generation, time.monotonic(), etag, body)
+    return _respond(request, etag, body)
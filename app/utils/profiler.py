@@ -0,0 +1,135 @@
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Deque, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from ..config import get_settings
+
+settings = get_settings()
+
+# Keep per-request memory bounded even for very chatty endpoints
+MAX_SQL_STATEMENTS = 500
+MAX_STACK_DEPTH = 128
+
+
+class RequestProfile:
+    """Stack samples and SQL timings collected for one profiled request."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.duration_ms: Optional[float] = None
+        self.response_status: Optional[int] = None
+        self.stacks: Counter = Counter()
+        self.sql: List[dict] = []
+        self.sql_count = 0
+        self.sql_total_ms = 0.0
+        self.max_concurrent_requests = 1
+
+    def record_sql(self, statement: str, duration_ms: float):
+        self.sql_count += 1
+        self.sql_total_ms += duration_ms
+        if len(self.sql) < MAX_SQL_STATEMENTS:
+            self.sql.append({"statement": statement, "duration_ms": round(duration_ms, 3)})
+
+    def folded(self) -> str:
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "response_status": self.response_status,
+            "samples": sum(self.stacks.values()),
+            "max_concurrent_requests": self.max_concurrent_requests,
+            "sql_count": self.sql_count,
+            "sql_total_ms": round(self.sql_total_ms, 3),
+        }
+
+
+class StackSampler(threading.Thread):
+    """
+    Periodically samples the call stack of one thread into a profile.
+
+    Async requests share the event loop thread, so samples are loop-wide:
+    while other requests are in flight, their frames land in this profile
+    too. `concurrency` reports the number of requests in flight, and the
+    peak is kept as the profile's max_concurrent_requests; stacks are only
+    attributable to the profiled request when it stays at 1.
+    """
+
+    def __init__(
+        self,
+        profile: RequestProfile,
+        thread_id: int,
+        interval: float,
+        concurrency: Callable[[], int] = lambda: 1
+    ):
+        super().__init__(daemon=True)
+        self.profile = profile
+        self.thread_id = thread_id
+        self.interval = interval
+        self.concurrency = concurrency
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.profile.max_concurrent_requests = max(
+                self.profile.max_concurrent_requests, self.concurrency()
+            )
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.profile.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+# The profile of the request being handled in the current context, if any
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+# Most recent profiles, oldest dropped first
+profiles: Deque[RequestProfile] = deque(maxlen=settings.PROFILING_RING_SIZE)
+
+
+def get_profile(profile_id: str) -> Optional[RequestProfile]:
+    for profile in profiles:
+        if profile.id == profile_id:
+            return profile
+    return None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None and conn.info.get("profile_query_start"):
+        started = conn.info["profile_query_start"].pop()
+        profile.record_sql(statement, (time.perf_counter() - started) * 1000)
+
+
+def install_sql_timing(engine: Engine):
+    """Time SQL statements for profiled requests. Only installed when profiling is enabled."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
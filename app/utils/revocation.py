@@ -0,0 +1,121 @@
+import heapq
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from ..models.revoked_token import RevokedToken
+from ..config import get_settings
+
+settings = get_settings()
+
+
+def _epoch(value: datetime) -> float:
+    # Timestamps are stored as naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    """
+    In-process view of the revoked_tokens table.
+
+    Revoked jtis live in an exact dict, so checking a token is a single
+    lookup with no database access.
+    Per-user cutoffs (disable, forced reset) revoke every token issued to the
+    user before the cutoff. Entries are evicted in expiry order once the
+    tokens they cover have expired.
+    """
+
+    def __init__(self):
+        self.jtis: Dict[str, float] = {}  # jti -> expires_at
+        self.user_cutoffs: Dict[str, Tuple[float, float]] = {}  # username -> (revoked_at, expires_at)
+        self.expiry_heap: List[Tuple[float, str, str]] = []  # (expires_at, kind, key)
+        self.last_synced_at: Optional[float] = None
+
+    def add_jti(self, jti: str, expires_at: float):
+        if expires_at <= time.time() or jti in self.jtis:
+            return
+        self.jtis[jti] = expires_at
+        heapq.heappush(self.expiry_heap, (expires_at, "jti", jti))
+
+    def add_user_cutoff(self, username: str, revoked_at: float, expires_at: float):
+        if expires_at <= time.time():
+            return
+        current = self.user_cutoffs.get(username)
+        if current is None or current[0] < revoked_at:
+            self.user_cutoffs[username] = (revoked_at, expires_at)
+            heapq.heappush(self.expiry_heap, (expires_at, "user", username))
+
+    def evict_expired(self):
+        now = time.time()
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            expires_at, kind, key = heapq.heappop(self.expiry_heap)
+            if kind == "jti" and self.jtis.get(key) == expires_at:
+                del self.jtis[key]
+            elif kind == "user" and self.user_cutoffs.get(key, (0, None))[1] == expires_at:
+                del self.user_cutoffs[key]
+
+    def is_revoked(self, payload: dict) -> bool:
+        if self.expiry_heap and self.expiry_heap[0][0] <= time.time():
+            self.evict_expired()
+
+        cutoff = self.user_cutoffs.get(payload.get("sub"))
+        if cutoff is not None and payload.get("iat", 0) <= cutoff[0]:
+            return True
+
+        jti = payload.get("jti")
+        return jti is not None and jti in self.jtis
+
+    def load(self, row: RevokedToken):
+        expires_at = _epoch(row.expires_at)
+        if row.jti:
+            self.add_jti(row.jti, expires_at)
+        elif row.username:
+            self.add_user_cutoff(row.username, _epoch(row.revoked_at), expires_at)
+
+    def sync(self, db: Session):
+        """
+        Pick up revocations made by other workers, at most every
+        REVOCATION_SYNC_SECONDS. Only unexpired rows are kept in the table,
+        so reloading all of them stays cheap and can't miss a late commit.
+        """
+        now = time.monotonic()
+        if self.last_synced_at is not None and now - self.last_synced_at < settings.REVOCATION_SYNC_SECONDS:
+            return
+        self.last_synced_at = now
+
+        rows = db.query(RevokedToken)\
+            .filter(RevokedToken.expires_at > datetime.utcnow())\
+            .all()
+        for row in rows:
+            self.load(row)
+
+
+revocations = RevocationList()
+
+
+def _store(db: Session, row: RevokedToken):
+    db.add(row)
+    # Writes are rare, so this is a cheap place to drop rows that no longer matter
+    db.query(RevokedToken)\
+        .filter(RevokedToken.expires_at <= datetime.utcnow())\
+        .delete(synchronize_session=False)
+    db.commit()
+    db.refresh(row)
+    revocations.load(row)
+
+
+def revoke_token(db: Session, payload: dict):
+    """Revoke a single token (logout)."""
+    if payload.get("jti") is None:
+        return
+    _store(db, RevokedToken(
+        jti=payload["jti"],
+        expires_at=datetime.utcfromtimestamp(payload["exp"])
+    ))
+
+
+def revoke_user_tokens(db: Session, username: str):
+    """Revoke every token issued to the user so far (disable, forced reset)."""
+    now = datetime.utcnow()
+    lifetime = timedelta(minutes=max(settings.ACCESS_TOKEN_EXPIRE_MINUTES, 15))
+    _store(db, RevokedToken(username=username, revoked_at=now, expires_at=now + lifetime))
@@ -0,0 +1,138 @@
+import hashlib
+import math
+import struct
+import zlib
+from typing import List, Optional, Tuple
+
+
+class HyperLogLog:
+    """
+    Distinct-count sketch. 2**precision one-byte registers give a
+    standard error of about 1.04 / sqrt(2**precision) (1.6% at precision 12).
+    Merging two sketches gives the sketch of the union.
+    """
+
+    def __init__(self, precision: int = 12, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = registers if registers is not None else bytearray(self.size)
+
+    def add(self, value):
+        x = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+        index = x >> (64 - self.precision)
+        remaining = x & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        estimate = alpha * self.size * self.size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Small cardinalities: linear counting is more accurate
+        if estimate <= 2.5 * self.size and zeros:
+            estimate = self.size * math.log(self.size / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(bytes([self.precision]) + bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        raw = zlib.decompress(data)
+        return cls(precision=raw[0], registers=bytearray(raw[1:]))
+
+
+class TDigest:
+    """
+    Quantile sketch (merging t-digest). The number of centroids is bounded
+    by a small multiple of `compression`, with small ones near the tails so
+    p95/p99 stay accurate.
+    Merging two digests gives the digest of the combined data.
+    """
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.centroids: List[Tuple[float, float]] = []  # (mean, weight), sorted by mean
+        self.buffer: List[Tuple[float, float]] = []
+        self.total_weight = 0.0
+
+    def add(self, value: float, weight: float = 1.0):
+        self.buffer.append((float(value), weight))
+        self.total_weight += weight
+        if len(self.buffer) >= self.compression * 5:
+            self._compress()
+
+    def merge(self, other: "TDigest"):
+        other._compress()
+        self.buffer.extend(other.centroids)
+        self.total_weight += other.total_weight
+        # Like add(), so merging many digests compresses once per batch
+        if len(self.buffer) >= self.compression * 5:
+            self._compress()
+
+    def _compress(self):
+        if not self.buffer:
+            return
+        points = sorted(self.centroids + self.buffer)
+        self.buffer = []
+
+        merged = []
+        mean, weight = points[0]
+        so_far = 0.0
+        for next_mean, next_weight in points[1:]:
+            q = (so_far + weight + next_weight / 2) / self.total_weight
+            limit = 4 * self.total_weight * q * (1 - q) / self.compression
+            if weight + next_weight <= max(limit, 1):
+                mean += (next_mean - mean) * next_weight / (weight + next_weight)
+                weight += next_weight
+            else:
+                merged.append((mean, weight))
+                so_far += weight
+                mean, weight = next_mean, next_weight
+        merged.append((mean, weight))
+        self.centroids = merged
+
+    def count(self) -> int:
+        return int(self.total_weight)
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+
+        target = q * self.total_weight
+        cumulative = 0.0
+        for i, (mean, weight) in enumerate(self.centroids):
+            # Interpolate between the centres of neighbouring centroids
+            if cumulative + weight / 2 >= target:
+                if i == 0:
+                    return mean
+                prev_mean, prev_weight = self.centroids[i - 1]
+                prev_centre = cumulative - prev_weight / 2
+                centre = cumulative + weight / 2
+                return prev_mean + (mean - prev_mean) * (target - prev_centre) / (centre - prev_centre)
+            cumulative += weight
+        return self.centroids[-1][0]
+
+    def to_bytes(self) -> bytes:
+        self._compress()
+        values = [value for centroid in self.centroids for value in centroid]
+        return zlib.compress(struct.pack(f"!I{len(values)}d", self.compression, *values))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TDigest":
+        raw = zlib.decompress(data)
+        (compression,) = struct.unpack_from("!I", raw)
+        values = struct.unpack_from(f"!{(len(raw) - 4) // 8}d", raw, 4)
+        digest = cls(compression)
+        digest.centroids = list(zip(values[0::2], values[1::2]))
+        digest.total_weight = sum(weight for _, weight in digest.centroids)
+        return digest
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+# Run from the repository root:
+#   python -m app.utils.startup_report [top_n]
+#
+# Imports app.main in a fresh interpreter with -X importtime and reports
+# the total import cost plus the most expensive modules, so slow imports
+# creeping back into the startup path are easy to spot.
+
+
+def measure_imports(module: str = "app.main"):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Drop the separator space but keep the nesting indentation
+        timings.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def startup_report(module: str = "app.main", top_n: int = 15) -> str:
+    timings = measure_imports(module)
+
+    # The module and its parent packages are the top-level entries; their
+    # cumulative times add up to the total cost of the import
+    parents = {".".join(module.split(".")[:i]) for i in range(1, module.count(".") + 2)}
+    total_us = sum(cumulative for name, _, cumulative in timings if name in parents)
+
+    lines = [f"Total import time for {module}: {total_us / 1000:.1f} ms", ""]
+    lines.append(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    slowest = sorted(timings, key=lambda t: t[2], reverse=True)[:top_n]
+    for name, self_us, cumulative_us in slowest:
+        lines.append(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name.strip()}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    top_n = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    print(startup_report(top_n=top_n))